@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from instrumentation import metrics
+from rate_stream import make_session
+
+PRICE_URL = 'https://api.coingecko.com/api/v3/simple/price'
+
+
+def load_coins(path):
+    """Read a name,ticker per line coin file (like hw9/coins.txt) into a name -> ticker map."""
+    coin_map = {}
+    with open(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                name, ticker = line.strip().split(',')
+                coin_map[name.strip()] = ticker.strip()
+    return coin_map
+
+
+def chunked(items, size):
+    """Split a list into consecutive slices of at most size items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def make_batches(coin_map, ids_per_batch=50, currencies_per_batch=25):
+    """Tile the id x vs_currency space into (ids, currencies) blocks that each fit in one URL."""
+    ids = list(coin_map.keys())
+    currencies = list(dict.fromkeys(coin_map.values()))
+    return [
+        (id_block, currency_block)
+        for id_block in chunked(ids, ids_per_batch)
+        for currency_block in chunked(currencies, currencies_per_batch)
+    ]
+
+
+def fetch_batch(session, ids, currencies, url=PRICE_URL, retries=3, backoff=1.0, timeout=10.0, sleep=time.sleep):
+    """
+    Fetch one (ids, currencies) block, retrying only this block on failure.
+
+    Network errors, 429s and 5xx responses are retried with exponential
+    backoff; other statuses fail at once. Returns the decoded partial
+    simple/price response, or None once the retries are used up.
+    """
+    params = {'ids': ','.join(ids), 'vs_currencies': ','.join(currencies)}
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+            if response.status_code == 200:
+                return response.json()
+            error = f"status {response.status_code}"
+            retryable = response.status_code == 429 or response.status_code >= 500
+        except requests.RequestException as e:
+            error = str(e)
+            retryable = True
+        if not retryable or attempt == retries:
+            print(f"Error fetching rates for {len(ids)} coins x {len(currencies)} currencies: {error}")
+            return None
+        metrics.count('fetch_retries')
+        sleep(backoff * 2 ** attempt)
+
+
+def fetch_rates(coin_map, url=PRICE_URL, ids_per_batch=50, currencies_per_batch=25, max_workers=8,
+                session=None, retries=3, backoff=1.0, timeout=10.0, sleep=time.sleep):
+    """
+    Fetch the full rate snapshot for coin_map as concurrent batched requests.
+
+    The id x currency space is split into blocks, and the blocks are fetched
+    in parallel over one pooled session. Their partial responses are merged
+    into a single {name: {ticker: rate}} snapshot, the same shape as one
+    unbatched simple/price response. A block that still fails after its
+    retries is left out, so the snapshot is partial rather than missing.
+
+    Args:
+        coin_map (dict): Coin name -> ticker symbol
+        url (str): simple/price endpoint
+        ids_per_batch (int): Coin ids per request
+        currencies_per_batch (int): vs_currencies per request
+        max_workers (int): Concurrent requests
+        session (requests.Session): Pooled session to reuse (created if None)
+        retries (int): Retries per block
+        backoff (float): Base retry delay in seconds
+        timeout (float): Per-request timeout in seconds
+        sleep (callable): Sleep function, swappable for tests and benchmarks
+
+    Returns:
+        dict: Merged snapshot
+    """
+    batches = make_batches(coin_map, ids_per_batch, currencies_per_batch)
+    session = session or make_session(pool_size=max_workers)
+    metrics.count('fetch_batches', len(batches))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        parts = pool.map(
+            lambda batch: fetch_batch(session, batch[0], batch[1], url=url, retries=retries,
+                                      backoff=backoff, timeout=timeout, sleep=sleep),
+            batches
+        )
+        data = {}
+        for part in parts:
+            for coin, coin_data in (part or {}).items():
+                data.setdefault(coin, {}).update(coin_data)
+    return data
@@ -0,0 +1,139 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from csr_graph import CSRGraph
+from instrumentation import metrics
+from negative_cycle import TopK, cycle_to_opportunity
+
+
+def find_bounded_cycles(g, max_hops=4, threshold=1.0006, top_k=10, prune=True):
+    """
+    Depth-limited DFS for the best cycles of up to max_hops edges, with branch-and-bound.
+
+    Each cycle is searched once, from its smallest node index, so every node
+    after the start has a larger index. The search keeps the running
+    log-product of the partial path, on edges reweighted by node potentials so
+    that cycle sums are unchanged but price scale cancels out. Before extending
+    a path, the search adds an optimistic bound for the edges still to come.
+    That bound is the new node's best outgoing log-rate plus the best prefix
+    sum of the globally largest per-node best log-rates. A branch is cut when even that cannot beat
+    log(threshold) or the current top-k floor. With prune=False the same DFS
+    runs exhaustively, which gives a reference for checking results.
+
+    Args:
+        g (CSRGraph or networkx.DiGraph): Exchange rate graph
+        max_hops (int): Longest cycle (in edges) to consider
+        threshold (float): Minimum round-trip factor worth reporting
+        top_k (int): Number of opportunities to return
+        prune (bool): Apply the bounds (False gives the exhaustive reference)
+
+    Returns:
+        list: Opportunity dicts sorted by arbitrage factor, highest first
+    """
+    csr = CSRGraph.coerce(g)
+    n = len(csr)
+
+    # Node potentials from a BFS spanning tree: phi[v] = phi[u] + log(rate(u, v)) on tree edges.
+    # Reweighting an edge to log(rate) + phi[u] - phi[v] leaves every cycle's sum unchanged
+    # but strips out each coin's price scale, so sorting edges by it finds good cycles first.
+    phi = [None] * n
+    for root in range(n):
+        if phi[root] is not None:
+            continue
+        phi[root] = 0.0
+        queue = deque([root])
+        while queue:
+            u = queue.popleft()
+            for v, rate in csr.neighbors(u):
+                if phi[v] is None and rate > 0:
+                    phi[v] = phi[u] + math.log(rate)
+                    queue.append(v)
+
+    # Reduced log-rate adjacency, best edges first so good cycles are found early
+    out = []
+    reduced = np.full((n, n), -np.inf)  # reduced[u, v], -inf where there is no quote
+    for u in range(n):
+        row = sorted(
+            ((math.log(rate) + phi[u] - phi[v], v, rate) for v, rate in csr.neighbors(u) if v != u and rate > 0),
+            reverse=True
+        )
+        out.append(row)
+        for log_rate, v, _ in row:
+            reduced[u, v] = max(reduced[u, v], log_rate)
+
+    top = TopK(top_k)
+    log_threshold = math.log(threshold)
+    visited = 0
+
+    for start in range(n):
+        if prune:
+            back = _return_bounds(reduced, start, max_hops)
+        path = [start]
+        rates = []
+        on_path = {start}
+        # Stack of (neighbor iterator, log-product of the path so far)
+        stack = [(iter(out[start]), 0.0)]
+
+        while stack:
+            edges, log_product = stack[-1]
+            step = next(edges, None)
+            if step is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                if rates:
+                    rates.pop()
+                continue
+
+            log_rate, v, rate = step
+            new_log = log_product + log_rate
+            floor = top.floor()
+            limit = max(log_threshold, math.log(floor)) if floor > 0 else log_threshold
+
+            if v == start:
+                if len(path) >= 2 and new_log > limit:
+                    factor = rate
+                    for r in rates:
+                        factor *= r
+                    cycle = [csr.nodes[i] for i in path]
+                    top.push(factor, cycle_to_opportunity(cycle, factor))
+                continue
+            if v < start or v in on_path or len(path) >= max_hops:
+                continue
+
+            if prune:
+                remaining = back[max_hops - len(path)]  # Edges left to get from v back to start
+                if new_log + remaining[-1] <= limit:
+                    # Edges are sorted best-first, so no later sibling can do better either
+                    stack[-1] = (iter(()), log_product)
+                    continue
+                if new_log + remaining[v - start - 1] <= limit:
+                    continue
+
+            visited += 1
+            path.append(v)
+            rates.append(rate)
+            on_path.add(v)
+            stack.append((iter(out[v]), new_log))
+
+    metrics.count('partial_paths', visited)
+    return top.items()
+
+
+def _return_bounds(reduced, start, max_hops):
+    """
+    Best reduced log-return to start from each node after it, per number of edges left.
+
+    back[r][i] is the best sum of at most r edges from node start + 1 + i back
+    to start, through nodes after start. Walks may repeat nodes, so this never
+    underestimates a simple cycle's return leg. back[r][-1] holds the best
+    value over all nodes, for cutting every remaining sibling at once.
+    """
+    inner = reduced[start + 1:, start + 1:]
+    best = reduced[start + 1:, start].copy()  # One edge: straight back to start
+    back = [None, np.append(best, best.max(initial=-np.inf))]
+    for _ in range(2, max_hops):
+        best = np.maximum(best, (inner + best[None, :]).max(axis=1, initial=-np.inf))
+        back.append(np.append(best, best.max(initial=-np.inf)))
+    return back
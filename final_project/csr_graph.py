@@ -0,0 +1,149 @@
+from array import array
+from bisect import bisect_left
+
+
+class CSRGraph:
+    """
+    Compact, integer-indexed directed rate graph in CSR form.
+
+    Node i's out-edges are indices[indptr[i]:indptr[i + 1]] (sorted), with the
+    matching rates in weights at the same positions. Tickers are mapped to ints
+    once, so the detectors' inner loops do array reads instead of three dict
+    lookups per edge. Convert from and to nx.DiGraph only at the pipeline edges.
+    """
+
+    def __init__(self, nodes, indptr, indices, weights):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    @classmethod
+    def from_networkx(cls, g):
+        """Build the CSR buffers from a graph with 'weight' edge rates."""
+        nodes = list(g.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        indptr = array('l', [0])
+        indices = array('l')
+        weights = array('d')
+        for u, neighbors in g.adjacency():
+            row = sorted((index[v], edge['weight'] or 0.0) for v, edge in neighbors.items())
+            indices.extend([v for v, _ in row])
+            weights.extend([rate for _, rate in row])
+            indptr.append(len(indices))
+        return cls(nodes, indptr, indices, weights)
+
+    @classmethod
+    def coerce(cls, g):
+        """Return g itself if it is already a CSRGraph, otherwise convert it from networkx."""
+        return g if isinstance(g, cls) else cls.from_networkx(g)
+
+    def subgraph(self, nodes):
+        """CSR slice induced by the given nodes (names), in the order given; no networkx round trip."""
+        keep = {self.index[node]: i for i, node in enumerate(nodes)}
+        indptr = array('l', [0])
+        indices = array('l')
+        weights = array('d')
+        for u in keep:
+            row = sorted(
+                (keep[self.indices[k]], self.weights[k])
+                for k in range(self.indptr[u], self.indptr[u + 1])
+                if self.indices[k] in keep
+            )
+            indices.extend([v for v, _ in row])
+            weights.extend([rate for _, rate in row])
+            indptr.append(len(indices))
+        return CSRGraph(nodes, indptr, indices, weights)
+
+    def adjacency(self):
+        """Integer out-neighbor lists, without self-loops."""
+        return [
+            [v for v in self.indices[self.indptr[u]:self.indptr[u + 1]] if v != u]
+            for u in range(len(self.nodes))
+        ]
+
+    def to_networkx(self):
+        """Rebuild an nx.DiGraph with the same nodes, edges and rates."""
+        import networkx as nx
+
+        g = nx.DiGraph()
+        g.add_nodes_from(self.nodes)
+        for u in range(len(self.nodes)):
+            for k in range(self.indptr[u], self.indptr[u + 1]):
+                g.add_edge(self.nodes[u], self.nodes[self.indices[k]], weight=self.weights[k])
+        return g
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def edge_count(self):
+        return len(self.indices)
+
+    def neighbors(self, u):
+        """Iterate (v, rate) over u's out-edges."""
+        start, end = self.indptr[u], self.indptr[u + 1]
+        return zip(self.indices[start:end], self.weights[start:end])
+
+    def edge_id(self, u, v):
+        """Position of edge u -> v in indices/weights, or -1 if it does not exist."""
+        start, end = self.indptr[u], self.indptr[u + 1]
+        k = bisect_left(self.indices, v, start, end)
+        return k if k < end and self.indices[k] == v else -1
+
+    def weight(self, u, v, default=None):
+        k = self.edge_id(u, v)
+        return self.weights[k] if k >= 0 else default
+
+    def path_weight(self, path):
+        """Product of rates along an int path, or None if an edge is missing."""
+        product = 1.0
+        for i in range(len(path) - 1):
+            k = self.edge_id(path[i], path[i + 1])
+            if k < 0:
+                return None
+            product *= self.weights[k]
+        return product
+
+    def reachable(self, source):
+        """Iterative DFS; returns a bytearray flag per node."""
+        seen = bytearray(len(self.nodes))
+        stack = [source]
+        while stack:
+            u = stack.pop()
+            if seen[u]:
+                continue
+            seen[u] = 1
+            stack.extend(self.indices[k] for k in range(self.indptr[u], self.indptr[u + 1]) if not seen[self.indices[k]])
+        return seen
+
+    def simple_paths(self, source):
+        """
+        Yield (path, forward product) for every simple path leaving source.
+
+        The yielded list is reused as the DFS backtracks, so callers must copy
+        it to keep it. Every target is covered in one traversal, which is the
+        union of all_simple_paths(source, target) over all targets.
+        """
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        on_path = bytearray(len(self.nodes))
+        on_path[source] = 1
+        path = [source]
+        products = [1.0]
+        edges = [iter(range(indptr[source], indptr[source + 1]))]
+
+        while edges:
+            k = next(edges[-1], None)
+            if k is None:
+                edges.pop()
+                on_path[path.pop()] = 0
+                products.pop()
+                continue
+            v = indices[k]
+            if on_path[v]:
+                continue
+            on_path[v] = 1
+            path.append(v)
+            products.append(products[-1] * weights[k])
+            yield path, products[-1]
+            edges.append(iter(range(indptr[v], indptr[v + 1])))
@@ -1,32 +1,49 @@
-import requests
+# Heavy dependencies (networkx, numpy, requests, the alpaca SDK) are imported
+# inside the functions that need them, so importing this module stays cheap
 import json
-import networkx as nx
-from itertools import permutations
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+from negative_cycle import TopK, find_arbitrage_cycles
+from branch_bound import find_bounded_cycles
+from incremental import IncrementalArbitrage, diff_snapshots
+from order_pipeline import net_legs, submit_concurrently
+from instrumentation import metrics, run_profiled
+from graph_index import GraphIndex
+from csr_graph import CSRGraph
 from datetime import datetime
+import argparse
 import os
 import csv
 import logging
+import threading
+import time
 
 # Set logging level to ERROR to suppress info and debug messages
 logging.basicConfig(level=logging.ERROR)
 
-# Alpaca API credentials
-api_key = ''
-api_secret = ''
-
-# Read the API keys from a file for security
-with open('APIkeys.txt', 'r') as file:
-    for line in file:
-        if 'API_KEY' in line:
-            api_key = line.split('=')[1].strip().strip("'")  # Extract API key
-        elif 'API_SECRET' in line:
-            api_secret = line.split('=')[1].strip().strip("'")  # Extract API secret
-
-# Initialize the Alpaca trading client for executing orders
-client = TradingClient(api_key, api_secret, paper=True)
+client = None  # Alpaca trading client, created on first use by get_client()
+client_lock = threading.Lock()  # First use may come from several order threads at once
+
+def load_credentials(path='APIkeys.txt'):
+    """Read the Alpaca API key and secret from a key file."""
+    api_key = ''
+    api_secret = ''
+    with open(path, 'r') as file:
+        for line in file:
+            if 'API_KEY' in line:
+                api_key = line.split('=')[1].strip().strip("'")  # Extract API key
+            elif 'API_SECRET' in line:
+                api_secret = line.split('=')[1].strip().strip("'")  # Extract API secret
+    return api_key, api_secret
+
+def get_client():
+    """Return the Alpaca trading client, loading credentials and the SDK on first use."""
+    global client
+    if client is None:
+        with client_lock:
+            if client is None:  # Another thread may have built it while we waited
+                from alpaca.trading.client import TradingClient
+                api_key, api_secret = load_credentials()
+                client = TradingClient(api_key, api_secret, paper=True)  # Initialize the Alpaca trading client
+    return client
 
 # Dictionary of cryptocurrency names and their respective ticker symbols
 coins = {
@@ -43,37 +60,63 @@ coins = {
     'sushiswap': 'sushi'
 }
 successful_orders = []  # List to track successful orders
+successful_orders_lock = threading.Lock()  # Orders may complete on worker threads
+
+def submit_leg(symbol, qty, side):
+    """Submit one market order and record it; raises if Alpaca rejects it."""
+    from alpaca.trading.requests import MarketOrderRequest
+    from alpaca.trading.enums import OrderSide, TimeInForce
+
+    order = MarketOrderRequest(
+        symbol=(symbol.strip() + 'USD').upper(),  # Format the symbol for Alpaca
+        notional=qty,  # Amount to invest
+        side=OrderSide(side),  # Buy or Sell
+        time_in_force=TimeInForce.GTC  # Order remains valid until canceled
+    )
+    get_client().submit_order(order_data=order)  # Submit the order to Alpaca
+    metrics.count('orders_submitted')
+    print(f"{side.capitalize()} order for {symbol} placed successfully.")
+    with successful_orders_lock:
+        successful_orders.append(symbol.upper())  # Track successful orders
 
 def place_order(symbols, qty, side):
     """Place market orders for given symbols."""
     for symbol in symbols:
-        order = MarketOrderRequest(
-            symbol=(symbol.strip() + 'USD').upper(),  # Format the symbol for Alpaca
-            notional=qty,  # Amount to invest
-            side=side,  # Buy or Sell
-            time_in_force=TimeInForce.GTC  # Order remains valid until canceled
-        )
         try:
-            client.submit_order(order_data=order)  # Submit the order to Alpaca
-            print(f"{side.capitalize()} order for {symbol} placed successfully.")
-            successful_orders.append(symbol.upper())  # Track successful orders
+            submit_leg(symbol, qty, side)
         except Exception as e:
             print(f"Error placing order for {symbol}: {str(e)}")  # Log any errors
 
-def get_exchange_rates():
-    """Fetch current cryptocurrency prices from CoinGecko."""
-    names_url = ','.join(coins.keys())  # Get the names of cryptocurrencies
-    ticker_url = ','.join(coins.values())  # Get the corresponding ticker symbols
-    url = f'https://api.coingecko.com/api/v3/simple/price?ids={names_url}&vs_currencies={ticker_url}'
-    response = requests.get(url)  # Make the API request
-    return response.json()  # Return the price data as JSON
+def place_orders_concurrently(legs, max_workers=8):
+    """Submit (symbol, qty, side) legs in parallel and return per-order results with latency."""
+    results = submit_concurrently(submit_leg, legs, max_workers=max_workers)
+    for result in results:
+        if not result['ok']:
+            print(f"Error placing order for {result['symbol']}: {result['error']}")  # Log any errors
+    return results
+
+def price_url(coin_map=None):
+    """Build the single CoinGecko simple/price URL for every tracked coin (used by --stream)."""
+    coin_map = coin_map or coins
+    names_url = ','.join(coin_map.keys())  # Get the names of cryptocurrencies
+    ticker_url = ','.join(coin_map.values())  # Get the corresponding ticker symbols
+    return f'https://api.coingecko.com/api/v3/simple/price?ids={names_url}&vs_currencies={ticker_url}'
+
+def get_exchange_rates(coin_map=None, session=None):
+    """Fetch current cryptocurrency prices from CoinGecko as concurrent batches merged into one snapshot."""
+    from batch_fetch import fetch_rates
+
+    return fetch_rates(coin_map or coins, session=session)
 
-def build_graph(data):
-    """Construct a directed graph from exchange rate data."""
+def build_graph(data, coin_map=None):
+    """Construct a directed graph from exchange rate data (coin_map defaults to coins)."""
+    import networkx as nx
+
+    coin_map = coin_map or coins
     g = nx.DiGraph()  # Initialize a directed graph
     for coin, coin_data in data.items():
         for tkr, rate in coin_data.items():
-            node_from = coins[coin]  # Get the source node
+            node_from = coin_map[coin]  # Get the source node
             node_to = tkr  # Get the target node
             try:
                 g.add_edge(node_from, node_to, weight=rate)  # Add an edge with the exchange rate
@@ -82,69 +125,100 @@ def build_graph(data):
                 continue
     return g  # Return the constructed graph
 
-def dfs(graph, node, visited):
-    """Perform a depth-first search to find reachable nodes."""
-    visited.add(node)  # Mark the current node as visited
-    for neighbor in graph[node]:
-        if neighbor not in visited:
-            dfs(graph, neighbor, visited)  # Recursively visit neighbors
-
-def check_reachability(graph, start_node):
-    """Check which nodes are reachable from the starting node."""
-    visited = set()  # Set to track visited nodes
-    dfs(graph, start_node, visited)  # Perform DFS
-    all_nodes = set(graph.nodes)  # Get all nodes in the graph
-    missing_nodes = all_nodes - visited  # Identify missing nodes
-    return missing_nodes  # Return unreachable nodes
-
-def check_arbitrage(g):
-    """Identify potential arbitrage opportunities in the graph."""
-    arbitrage_opportunities = []  # List to store found opportunities
-
-    # Check reachability from BTC
-    missing_nodes = check_reachability(g, 'btc')
-
-    if missing_nodes:
-        print(f"Not all nodes are reachable from 'btc'. Missing nodes: {missing_nodes}")
-        return []  # Exit if not all nodes are reachable
-    else:
-        print("All nodes are reachable from 'btc'. Proceeding with arbitrage check...")
-
-    # Check for arbitrage opportunities between all pairs of nodes
-    for n1, n2 in permutations(g.nodes, 2):
-        if n1 in missing_nodes or n2 in missing_nodes:
-            continue  # Skip if either node is missing
-
-        for path in nx.all_simple_paths(g, source=n1, target=n2):
-            try:
-                # Calculate the product of weights for the forward path
-                path_weight_to = 1.0
-                for i in range(len(path) - 1):
-                    path_weight_to *= g[path[i]][path[i + 1]]['weight']
-
-                # Calculate the product of weights for the reverse path
-                path_reverse = list(reversed(path))
-                path_weight_from = 1.0
-                for i in range(len(path_reverse) - 1):
-                    path_weight_from *= g[path_reverse[i]][path_reverse[i + 1]]['weight']
-
-                arbitrage_factor = path_weight_to * path_weight_from  # Calculate the arbitrage factor
-
-                # Store the opportunity if it exceeds the threshold
-                if arbitrage_factor > 1.0006:
-                    arbitrage_opportunities.append({
-                        "arbitrage_factor": arbitrage_factor,
-                        "forward_path": path,
-                        "reverse_path": path_reverse
-                    })
-
-            except KeyError:
-                print(f"Missing edge for path: {path}")  # Handle missing edges
+def find_path_opportunities(g, pairs=None, top_k=10):
+    """Score every simple path and its reversal (exhaustive, exponential time); g may be a CSRGraph."""
+    top_opportunities = TopK(top_k)  # Bounded heap of the best opportunities found
+    paths_enumerated = 0
+    csr = CSRGraph.coerce(g)  # Integer-indexed arrays for the path loop
+    wanted = None if pairs is None else {(csr.index[n1], csr.index[n2]) for n1, n2 in pairs}
+
+    # One DFS per source covers the paths to every target at once
+    for n1 in range(len(csr)):
+        for path, path_weight_to in csr.simple_paths(n1):
+            n2 = path[-1]
+            if wanted is not None and (n1, n2) not in wanted:
+                continue  # Pair cannot form a round trip
+            paths_enumerated += 1
+            if n2 < n1:
+                continue  # Same round trip as its reversal, which is scored from n2 instead
+
+            # Calculate the product of weights for the reverse path
+            path_reverse = path[::-1]
+            path_weight_from = csr.path_weight(path_reverse)
+            if path_weight_from is None:
+                print(f"Missing edge for path: {[csr.nodes[i] for i in path]}")  # Handle missing edges
                 continue
 
-    # Sort opportunities by arbitrage factor and select the top 10
-    arbitrage_opportunities.sort(key=lambda x: x["arbitrage_factor"], reverse=True)
-    top_10_opportunities = arbitrage_opportunities[:10]
+            arbitrage_factor = path_weight_to * path_weight_from  # Calculate the arbitrage factor
+
+            # Keep the opportunity if it exceeds the threshold and beats the current top-k
+            if arbitrage_factor > 1.0006:
+                top_opportunities.push(arbitrage_factor, {
+                    "arbitrage_factor": arbitrage_factor,
+                    "forward_path": [csr.nodes[i] for i in path],
+                    "reverse_path": [csr.nodes[i] for i in path_reverse]
+                })
+
+    metrics.count('paths_enumerated', paths_enumerated)
+    return top_opportunities.items()
+
+# Searches check_arbitrage can run, for the command-line --method choices
+METHODS = ('simple_paths', 'parallel', 'branch_bound', 'matrix', 'bellman_ford')
+
+def check_arbitrage(g, method='simple_paths', max_hops=4):
+    """
+    Identify potential arbitrage opportunities in the graph.
+
+    method='simple_paths' (the default, and what main() trades on) scores
+    every simple path followed by its reversal, exactly as the original scan
+    did; method='parallel' runs that same scan sharded across a process pool.
+    The other methods look for simple cycles of up to max_hops edges instead:
+    method='branch_bound' searches them depth-first and cuts branches that
+    cannot beat the threshold or the current top 10, and method='matrix'
+    scores every 2-4 hop cycle at once on a NumPy rate matrix; both return
+    the exact top 10 of those cycles. method='bellman_ford' is a fast,
+    polynomial heuristic: it reports the cycles that repeated negative-cycle
+    detection on -log(rate) weights extracts, which is not an exact top 10.
+    Out-and-back round trips are only seen by the path scans, so the cycle
+    methods can report fewer opportunities.
+    """
+    # Index strongly connected components: a round trip never leaves its component
+    # Convert once: the index and every engine below share this snapshot's CSR arrays
+    with metrics.stage('build_csr'):
+        csr = CSRGraph.coerce(g)
+    with metrics.stage('check_reachability'):
+        index = GraphIndex(csr)
+    components = index.cyclic_components()
+    skipped = set(csr.nodes) - {node for component in components for node in component}
+
+    if not components:
+        print("No strongly connected components with more than one node. Nothing to check.")
+        return []
+    if skipped:
+        print(f"Skipping nodes that are not on any round trip: {skipped}")
+    print(f"Proceeding with arbitrage check over {len(components)} strongly connected component(s)...")
+
+    top_opportunities = TopK(10)
+    with metrics.stage('check_arbitrage'):
+        for component in components:
+            sub = csr.subgraph(component)  # Only pairs inside the same component can round-trip
+            if method == 'bellman_ford':
+                found = find_arbitrage_cycles(sub, threshold=1.0006, top_k=10, max_hops=max_hops)
+            elif method == 'matrix':
+                from rate_matrix import RateMatrix, find_short_cycles
+                found = find_short_cycles(RateMatrix.from_graph(sub), max_hops=max_hops, threshold=1.0006, top_k=10)
+            elif method == 'simple_paths':
+                found = find_path_opportunities(sub, index.candidate_pairs(component))
+            elif method == 'parallel':
+                from parallel_search import find_path_opportunities_parallel
+                found = find_path_opportunities_parallel(sub, threshold=1.0006, top_k=10)
+            elif method == 'branch_bound':
+                found = find_bounded_cycles(sub, max_hops=max_hops, threshold=1.0006, top_k=10)
+            else:
+                raise ValueError(f"Unknown arbitrage method: {method}")
+            for opportunity in found:
+                top_opportunities.push(opportunity['arbitrage_factor'], opportunity)
+    top_10_opportunities = top_opportunities.items()  # Best 10 across all components, highest first
 
     print("=" * 50)
     if top_10_opportunities:
@@ -156,7 +230,7 @@ def check_arbitrage(g):
         # Save results in the existing data folder
         results_path = os.path.join('data', 'results.json')
         mkdirs = os.makedirs(os.path.dirname(results_path), exist_ok=True)  # Create directory if it doesn't exist
-        with open(results_path, 'w') as json_file:
+        with metrics.stage('write_results_json'), open(results_path, 'w') as json_file:
             json.dump(top_10_opportunities, json_file, indent=4)  # Save results as JSON
 
         return top_10_opportunities  # Return found opportunities
@@ -190,37 +264,103 @@ def save_arbitrage_pairs_to_csv(opportunities):
     except Exception as e:
         print("Error saving arbitrage pairs to CSV:", str(e))  # Log any errors
 
-def main():
-    """Main function to execute the arbitrage trading process."""
-    positions = client.get_all_positions()  # Fetch current portfolio positions
+def open_history(path=os.path.join('data', 'rates.ratehist'), coin_map=None):
+    """Open the rate history for coin_map, moving an existing file for another coin set aside first."""
+    from history_store import CoinMismatchError, RateHistory
+
+    coin_map = coin_map or coins
+    try:
+        return RateHistory(path, coin_map)
+    except CoinMismatchError:
+        root, ext = os.path.splitext(path)
+        archived = f"{root}_{datetime.fromtimestamp(os.path.getmtime(path)):%Y.%m.%d_%H.%M.%S}{ext}"
+        os.replace(path, archived)  # Keep the old records readable under their own header
+        print(f"Coin set changed: moved {path} to {archived} and started a new history")
+        return RateHistory(path, coin_map)
+
+def stream_arbitrage(interval=10.0, max_ticks=None, url=None, session=None):
+    """
+    Poll rates over a pooled session and yield (timestamp, opportunities, latency) per new snapshot.
+
+    The first snapshot builds the graph and candidate cycles; later ones only
+    re-score cycles through the quotes that changed. Latency is the time from
+    receiving the snapshot to having a ranked decision.
+    """
+    from rate_stream import poll_rates
+
+    tracker = None  # Incremental detector, built from the first snapshot
+    previous = None
+    history = open_history()
+    for timestamp, data in poll_rates(url or price_url(), interval=interval, session=session, max_ticks=max_ticks):
+        history.append(data, timestamp)  # Keep every tick for backtests
+        changes = diff_snapshots(previous, data, coins) if previous is not None else None
+        if tracker is None or any(edge not in tracker.rates for edge in changes):
+            tracker = IncrementalArbitrage(build_graph(data))  # New coin or quote: rebuild
+            top = tracker.top()
+        else:
+            top = tracker.update(changes)
+        previous = data
+        yield timestamp, top, time.time() - timestamp
+
+def detect(method='simple_paths'):
+    """Fetch rates, record them and find arbitrage opportunities without touching Alpaca."""
+    with metrics.stage('get_exchange_rates'):
+        data = get_exchange_rates()  # Fetch exchange rates
+    with metrics.stage('append_history'):
+        open_history().append(data)  # Keep every tick for backtests
+    with metrics.stage('build_graph'):
+        g = build_graph(data)  # Construct the graph from the rate data
+
+    top_10_opportunities = check_arbitrage(g, method=method)  # Identify arbitrage opportunities
+
+    with metrics.stage('save_csv'):
+        save_arbitrage_pairs_to_csv(top_10_opportunities)  # Save opportunities to CSV
+    return top_10_opportunities
+
+def plan_legs(opportunities, qty=100, net=True):
+    """Turn opportunities into (symbol, qty, side) order legs: buy the first coin, sell the last (netted per symbol)."""
+    legs = []
+    for opportunity in opportunities:
+        forward_path = opportunity['forward_path']
+        buy_symbol = forward_path[0].upper()  # Get the symbol to buy
+        sell_symbol = forward_path[-1].upper()  # Get the symbol to sell
+        legs.append((buy_symbol, qty, 'buy'))
+        legs.append((sell_symbol, qty, 'sell'))
+    if not net:
+        return legs
+    netted = net_legs(legs)  # One order per symbol; opposing legs cancel
+    print(f"Netted {len(legs)} legs into {len(netted)} orders")
+    return netted
+
+def main(dry_run=False, method='simple_paths'):
+    """Main function to execute the arbitrage trading process (dry_run never touches Alpaca)."""
+    if dry_run:
+        for symbol, qty, side in plan_legs(detect(method)):
+            print(f"[dry run] Would place {side} order for {symbol} (${qty})")
+        return
+
+    with metrics.stage('get_positions'):
+        positions = get_client().get_all_positions()  # Fetch current portfolio positions
     print("\nInitial Portfolio Positions:\n" + "-" * 50)
     for position in positions:
         print(f"{position.qty} shares of {position.symbol}")  # Display initial positions
 
-    data = get_exchange_rates()  # Fetch exchange rates
-    g = build_graph(data)  # Construct the graph from the rate data
-
-    top_10_opportunities = check_arbitrage(g)  # Identify arbitrage opportunities
-
-    save_arbitrage_pairs_to_csv(top_10_opportunities)  # Save opportunities to CSV
+    top_10_opportunities = detect(method)
 
     # Place orders based on identified opportunities
     if top_10_opportunities:
-        for opportunity in top_10_opportunities:
-            forward_path = opportunity['forward_path']
-            buy_symbol = forward_path[0].upper()  # Get the symbol to buy
-            sell_symbol = forward_path[-1].upper()  # Get the symbol to sell
-            qty = 100  # Define quantity for orders
-
-            print(f"Placing buy order for {buy_symbol}...")
-            place_order([buy_symbol], qty, OrderSide.BUY)  # Place buy order
-
-            print(f"Placing sell order for {sell_symbol}...")
-            place_order([sell_symbol], qty, OrderSide.SELL)  # Place sell order
+        legs = plan_legs(top_10_opportunities)
+        print(f"Placing {len(legs)} orders...")
+        with metrics.stage('submit_orders'):
+            results = place_orders_concurrently(legs)  # Submit all legs in parallel
+        for result in results:
+            metrics.observe('order_submit', result['latency'])  # Per-order latency histogram
+            print(f"{result['side'].capitalize()} {result['symbol']}: {'ok' if result['ok'] else 'failed'} in {result['latency'] * 1000:.1f} ms")
     else:
         print("No arbitrage opportunities found. No orders will be placed.")
 
-    positions = client.get_all_positions()  # Fetch updated positions after trading
+    with metrics.stage('get_positions'):
+        positions = get_client().get_all_positions()  # Fetch updated positions after trading
     print("Successful Orders:", successful_orders)  # Display successful orders
     print("\nFinal Portfolio Positions:" + "-" * 50)
     for position in positions:
@@ -228,4 +368,30 @@ def main():
 
 # Run the main function if the script is executed directly
 if __name__ == "__main__":
-    main()  # Start the program
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crypto arbitrage detection and trading")
+    parser.add_argument('--stream', action='store_true', help="Poll rates continuously and report opportunities per tick")
+    parser.add_argument('--interval', type=float, default=10.0, help="Seconds between polls in --stream mode")
+    parser.add_argument('--metrics', nargs='?', const='-', help="Emit per-stage timings and counters as a JSON line (to stdout or the given file)")
+    parser.add_argument('--profile', action='store_true', help="Run under cProfile and print the hottest functions")
+    parser.add_argument('--dry-run', action='store_true', help="Detect and report opportunities without loading keys or touching Alpaca")
+    parser.add_argument('--method', default='simple_paths', choices=METHODS,
+                        help="check_arbitrage search to trade on (see check_arbitrage)")
+    parser.add_argument('--coins', help="name,ticker per line file with the coin universe to track (e.g. ../hw9/coins.txt)")
+    args = parser.parse_args()
+
+    if args.coins:
+        from batch_fetch import load_coins
+        coins.clear()
+        coins.update(load_coins(args.coins))  # Mutate in place so every default keeps pointing at it
+
+    if args.stream:
+        for timestamp, opportunities, latency in stream_arbitrage(interval=args.interval):
+            best = opportunities[0]['arbitrage_factor'] if opportunities else None
+            print(f"{datetime.fromtimestamp(timestamp):%H:%M:%S} {len(opportunities)} opportunities, best {best}, decided in {latency * 1000:.2f} ms")
+    elif args.profile:
+        run_profiled(main, dry_run=args.dry_run, method=args.method)
+    else:
+        metrics.enabled = args.metrics is not None
+        main(dry_run=args.dry_run, method=args.method)  # Start the program
+        if metrics.enabled:
+            metrics.emit(args.metrics)
\ No newline at end of file
@@ -0,0 +1,122 @@
+from csr_graph import CSRGraph
+
+
+def strongly_connected_components(adjacency):
+    """
+    Iterative Tarjan SCC over integer adjacency lists.
+
+    Uses an explicit work stack instead of recursion, so graph size is not
+    limited by Python's recursion limit. Components come out in reverse
+    topological order (sink components first).
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]  # (node, position in its adjacency list)
+
+        while work:
+            v, i = work[-1]
+            if i < len(adjacency[v]):
+                work[-1] = (v, i + 1)
+                w = adjacency[v][i]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+
+    return components
+
+
+class GraphIndex:
+    """
+    Per-snapshot reachability index: SCCs plus a bitset transitive closure.
+
+    reach[i] is a Python int whose bit j is set when node j is reachable from
+    node i. It is filled one component at a time in reverse topological order,
+    so each component ORs in the closures of the components it points to.
+    Two nodes can only be part of a round trip when they share an SCC.
+    """
+
+    def __init__(self, g):
+        csr = CSRGraph.coerce(g)  # Pass the snapshot's CSRGraph to reuse its integer adjacency
+        self.nodes = csr.nodes
+        self.position = csr.index
+        adjacency = csr.adjacency()
+
+        components = strongly_connected_components(adjacency)
+        self.component_of = [0] * len(self.nodes)
+        for c, component in enumerate(components):
+            for i in component:
+                self.component_of[i] = c
+
+        component_reach = [0] * len(components)
+        for c, component in enumerate(components):  # Sinks first, so successors are done
+            bits = 0
+            for i in component:
+                bits |= 1 << i
+                for j in adjacency[i]:
+                    if self.component_of[j] != c:
+                        bits |= component_reach[self.component_of[j]]
+            component_reach[c] = bits
+
+        self.reach = [component_reach[self.component_of[i]] for i in range(len(self.nodes))]
+        # Keep graph order inside and across components for deterministic output
+        self.components = sorted(
+            ([self.nodes[i] for i in sorted(component)] for component in components),
+            key=lambda members: self.position[members[0]]
+        )
+
+    def reachable(self, u, v):
+        """True if v can be reached from u."""
+        return bool(self.reach[self.position[u]] >> self.position[v] & 1)
+
+    def reachable_from(self, u):
+        """Set of nodes reachable from u (including u)."""
+        bits = self.reach[self.position[u]]
+        return {node for i, node in enumerate(self.nodes) if bits >> i & 1}
+
+    def same_component(self, u, v):
+        return self.component_of[self.position[u]] == self.component_of[self.position[v]]
+
+    def cyclic_components(self):
+        """Components with at least two nodes, i.e. the only places a round trip can exist."""
+        return [component for component in self.components if len(component) > 1]
+
+    def candidate_pairs(self, component):
+        """Ordered (n1, n2) pairs within a component that can reach each other both ways."""
+        return [
+            (n1, n2)
+            for n1 in component
+            for n2 in component
+            if n1 != n2 and self.reachable(n1, n2) and self.reachable(n2, n1)
+        ]
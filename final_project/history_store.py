@@ -0,0 +1,142 @@
+import json
+import math
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'RATEHIST'
+_PREFIX = struct.Struct('<8sI')  # Magic, length of the JSON header that follows
+
+
+class CoinMismatchError(ValueError):
+    """Raised when an existing history file was written for a different coin set."""
+
+
+class RateHistory:
+    """
+    Append-only binary log of rate snapshots, read back through np.memmap.
+
+    Layout: an 8-byte magic, a uint32 header length and a JSON header that
+    lists the coins (index -> name, ticker), padded to 8 bytes. Then come
+    fixed-width records of one float64 timestamp plus an n x n float64 rate
+    matrix, where rates[i, j] converts coin i into ticker j and NaN means
+    no quote. Because records are fixed-width and appended in time order,
+    a time range is two binary searches over the memory-mapped timestamps.
+    """
+
+    def __init__(self, path, coin_map=None):
+        """
+        Open path, creating it with coin_map's coins if it does not exist yet.
+
+        If the file exists and coin_map is given, it must match the file's
+        coins, otherwise CoinMismatchError is raised rather than silently
+        dropping the coins the header does not know.
+        """
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._read_header()
+            if coin_map is not None and dict(coin_map) != self.coin_map():
+                # Records are fixed-width per header, so a different universe cannot share the file
+                raise CoinMismatchError(
+                    f"{path} records {len(self.names)} coins that differ from the {len(coin_map)} given; "
+                    f"use a new file for this coin set"
+                )
+        elif coin_map is None:
+            raise ValueError(f"{path} does not exist; pass coin_map to create it")
+        else:
+            self.names = list(coin_map.keys())
+            self.tickers = list(coin_map.values())
+            self._write_header()
+
+        self.row = {name: i for i, name in enumerate(self.names)}
+        self.col = {tkr: j for j, tkr in enumerate(self.tickers)}
+        n = len(self.names)
+        self.dtype = np.dtype([('timestamp', '<f8'), ('rates', '<f8', (n, len(self.tickers)))])
+        records = self.records()
+        self.last_timestamp = float(records['timestamp'][-1]) if len(records) else None  # Read once, kept by append()
+
+    def _write_header(self):
+        header = json.dumps({"coins": [[name, tkr] for name, tkr in zip(self.names, self.tickers)]}).encode()
+        header += b' ' * (-(_PREFIX.size + len(header)) % 8)  # Keep records 8-byte aligned
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'wb') as file:
+            file.write(_PREFIX.pack(MAGIC, len(header)))
+            file.write(header)
+        self.offset = _PREFIX.size + len(header)
+
+    def _read_header(self):
+        with open(self.path, 'rb') as file:
+            magic, length = _PREFIX.unpack(file.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a rate history file")
+            header = json.loads(file.read(length))
+        self.names = [name for name, _ in header['coins']]
+        self.tickers = [tkr for _, tkr in header['coins']]
+        self.offset = _PREFIX.size + length
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - self.offset) // self.dtype.itemsize
+
+    def append(self, data, timestamp=None):
+        """
+        Append one simple/price response as a record.
+
+        Coins or tickers that are not in the header are ignored, since every
+        record must keep the same width. A snapshot older than the last
+        record (e.g. after a clock step) is reported and skipped so that
+        between() can keep binary searching; returns whether it was written.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            print(f"Skipping out-of-order snapshot at {timestamp} (last record at {self.last_timestamp})")
+            return False
+
+        record = np.zeros(1, dtype=self.dtype)
+        record['timestamp'] = timestamp
+        rates = np.full(record['rates'].shape[1:], np.nan)
+        for coin, coin_data in data.items():
+            i = self.row.get(coin)
+            if i is None:
+                continue
+            for tkr, rate in coin_data.items():
+                j = self.col.get(tkr)
+                if j is not None and rate is not None:
+                    rates[i, j] = rate
+        record['rates'] = rates
+
+        with open(self.path, 'ab') as file:
+            file.write(record.tobytes())
+        self.last_timestamp = timestamp
+        return True
+
+    def records(self):
+        """Memory-mapped view of every record (nothing is loaded until indexed)."""
+        if len(self) == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.offset, shape=(len(self),))
+
+    def between(self, start=None, end=None):
+        """Records with start <= timestamp <= end, as a view found by binary search."""
+        records = self.records()
+        timestamps = records['timestamp']
+        i = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        j = len(records) if end is None else np.searchsorted(timestamps, end, side='right')
+        return records[i:j]
+
+    def to_data(self, record):
+        """Turn one record back into the simple/price {name: {ticker: rate}} shape."""
+        rates = record['rates']
+        return {
+            name: {tkr: float(rates[i, j]) for j, tkr in enumerate(self.tickers) if not math.isnan(rates[i, j])}
+            for i, name in enumerate(self.names)
+        }
+
+    def coin_map(self):
+        return dict(zip(self.names, self.tickers))
+
+    def iter_snapshots(self, start=None, end=None):
+        """Yield (timestamp, data) for every record in the time range."""
+        for record in self.between(start, end):
+            yield float(record['timestamp']), self.to_data(record)
@@ -0,0 +1,126 @@
+import heapq
+from collections import defaultdict
+from itertools import permutations
+
+from negative_cycle import cycle_to_opportunity
+
+
+def enumerate_cycles(g, max_hops=3):
+    """List every simple cycle of 2..max_hops edges once, smallest node first."""
+    cycles = []
+    nodes = sorted(g.nodes)
+    for hops in range(2, max_hops + 1):
+        for cycle in permutations(nodes, hops):
+            if cycle[0] != min(cycle):
+                continue  # Only keep the canonical rotation
+            if all(g.has_edge(cycle[i], cycle[(i + 1) % hops]) for i in range(hops)):
+                cycles.append(cycle)
+    return cycles
+
+
+def diff_snapshots(old_data, new_data, coins):
+    """
+    Return {(from, to): rate} for every quote that changed between two CoinGecko responses.
+
+    Quotes present in old_data but missing from new_data are reported with a
+    rate of 0.0, so cycles through an edge that no longer exists drop out of
+    the ranking instead of keeping their last factor.
+    """
+    changes = {}
+    for coin, coin_data in new_data.items():
+        old_coin = old_data.get(coin, {})
+        for tkr, rate in coin_data.items():
+            if old_coin.get(tkr) != rate:
+                changes[(coins[coin], tkr)] = rate
+    for coin, old_coin in old_data.items():
+        coin_data = new_data.get(coin, {})
+        for tkr in old_coin:
+            if tkr not in coin_data:
+                changes[(coins[coin], tkr)] = 0.0  # Quote withdrawn
+    return changes
+
+
+class IncrementalArbitrage:
+    """
+    Keep candidate cycles and their factors between ticks.
+
+    Every edge maps to the cycles that use it, so update() only re-scores
+    cycles through changed edges. Rankings live in a lazy max-heap: stale
+    entries are skipped when read, so a tick costs O(c log n) for c touched
+    cycles instead of a full re-scan.
+    """
+
+    def __init__(self, g, cycles=None, max_hops=3, threshold=1.0006, top_k=10):
+        self.threshold = threshold
+        self.top_k = top_k
+        self.rates = {(u, v): rate for u, v, rate in g.edges(data='weight')}
+        self.edge_cycles = defaultdict(list)  # (u, v) -> cycles using that edge
+        self.factors = {}
+        self.heap = []  # (-factor, cycle) entries, possibly stale
+
+        if cycles is None:
+            cycles = enumerate_cycles(g, max_hops)
+        self.add_cycles(cycles)
+
+    def add_cycles(self, cycles):
+        """Register new candidate cycles (e.g. found by the negative-cycle engine)."""
+        for cycle in cycles:
+            cycle = tuple(cycle)
+            if cycle in self.factors:
+                continue
+            for i in range(len(cycle)):
+                self.edge_cycles[(cycle[i], cycle[(i + 1) % len(cycle)])].append(cycle)
+            self._score(cycle)
+
+    def _score(self, cycle):
+        """Recompute one cycle's factor and push it onto the ranking heap."""
+        factor = 1.0
+        for i in range(len(cycle)):
+            factor *= self.rates.get((cycle[i], cycle[(i + 1) % len(cycle)]), 0.0)
+        self.factors[cycle] = factor
+        heapq.heappush(self.heap, (-factor, cycle))
+
+    def update(self, changes):
+        """
+        Apply changed rates and re-score only the cycles through them.
+
+        Args:
+            changes (dict): {(from, to): new_rate} for edges that moved
+
+        Returns:
+            list: Current top opportunities after the update
+        """
+        touched = set()
+        for edge, rate in changes.items():
+            self.rates[edge] = rate
+            touched.update(self.edge_cycles.get(edge, ()))
+
+        for cycle in touched:
+            self._score(cycle)
+
+        # Drop stale entries once they outnumber live ones
+        if len(self.heap) > 2 * len(self.factors) + self.top_k:
+            self.heap = [(-factor, cycle) for cycle, factor in self.factors.items()]
+            heapq.heapify(self.heap)
+
+        return self.top()
+
+    def top(self):
+        """Return the ranked top-k opportunities above the threshold."""
+        best = []
+        popped = []
+        seen = set()
+        while self.heap and len(best) < self.top_k:
+            entry = heapq.heappop(self.heap)
+            factor, cycle = -entry[0], entry[1]
+            if self.factors.get(cycle) != factor or cycle in seen:
+                continue  # Stale or duplicate: this cycle has been re-scored since
+            seen.add(cycle)
+            popped.append(entry)
+            if factor <= self.threshold:
+                break  # Everything below is worse
+            best.append(cycle_to_opportunity(list(cycle), factor))
+
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+        return best
@@ -0,0 +1,109 @@
+import bisect
+import contextlib
+import json
+import sys
+import threading
+import time
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+_DISABLED = contextlib.nullcontext()  # Shared no-op returned by stage() when switched off
+
+
+class _StageTimer:
+    """Context manager that records one stage duration on exit."""
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Per-run stage timers, counters and latency histograms.
+
+    Disabled by default: stage() then hands back a shared null context and
+    count() returns immediately, so instrumented code pays one attribute
+    check per call. When enabled, updates take a lock because orders and
+    fetches record from worker threads.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}  # Stage name -> list of durations in seconds
+            self.counters = {}
+            self.started = time.time()
+
+    def stage(self, name):
+        """Time a block: `with metrics.stage('build_graph'): ...`."""
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, name)
+
+    def observe(self, name, seconds):
+        """Record a duration measured elsewhere (e.g. on a worker thread)."""
+        if self.enabled:
+            with self.lock:
+                self.stages.setdefault(name, []).append(seconds)
+
+    def count(self, name, n=1):
+        """Add n to a named counter."""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """Return the run's metrics as a JSON-serializable dict."""
+        with self.lock:  # Copy so workers can keep recording while we summarize
+            recorded = {name: list(durations) for name, durations in self.stages.items()}
+            counters = dict(self.counters)
+        stages = {}
+        for name, durations in recorded.items():
+            histogram = [0] * (len(BUCKETS_MS) + 1)
+            for duration in durations:
+                histogram[bisect.bisect_left(BUCKETS_MS, duration * 1000)] += 1
+            stages[name] = {
+                "calls": len(durations),
+                "total_ms": sum(durations) * 1000,
+                "max_ms": max(durations) * 1000,
+                "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], histogram))
+            }
+        return {"started": self.started, "stages": stages, "counters": counters}
+
+    def emit(self, path=None):
+        """Write the summary as one JSON line to path (appending) or stdout."""
+        line = json.dumps(self.summary())
+        if path in (None, '-'):
+            print(line, file=sys.stdout)
+        else:
+            with open(path, 'a') as file:
+                file.write(line + '\n')
+
+
+metrics = Metrics()
+
+
+def run_profiled(func, *args, sort='cumulative', limit=30, **kwargs):
+    """Run func under cProfile and print the top `limit` entries."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(sort).print_stats(limit)
@@ -0,0 +1,198 @@
+import heapq
+import math
+from array import array
+from collections import deque
+
+from csr_graph import CSRGraph
+from instrumentation import metrics
+
+# Relaxations smaller than this are treated as float noise so SPFA always terminates
+EPSILON = 1e-12
+
+
+class TopK:
+    """
+    Fixed-size min-heap that keeps the k best (factor, item) pairs.
+
+    Memory and insert cost stay O(k) / O(log k) however many candidates are
+    pushed, and floor() gives the factor a new candidate has to beat.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+        self.counter = 0  # Tiebreak so items themselves are never compared
+
+    def floor(self):
+        """Smallest kept factor, or -inf while the heap is not full yet."""
+        return self.heap[0][0] if len(self.heap) >= self.k else -math.inf
+
+    def push(self, factor, item):
+        """Offer a candidate; returns True if it was kept."""
+        if factor <= self.floor():
+            return False
+        self.counter += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (factor, self.counter, item))
+        else:
+            heapq.heapreplace(self.heap, (factor, self.counter, item))
+        return True
+
+    def items(self):
+        """Kept items, highest factor first."""
+        return [item for _, _, item in sorted(self.heap, key=lambda entry: (-entry[0], entry[1]))]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+def log_weights(csr, shift=0.0):
+    """
+    -log(rate) + shift per CSR edge, plus an active flag that is off for self-loops and missing quotes.
+
+    A shift of log(threshold) / max_hops makes every cycle of up to max_hops
+    edges whose factor beats threshold negative, so SPFA can test for them.
+    """
+    log_w = array('d', bytes(8 * csr.edge_count()))
+    active = bytearray(csr.edge_count())
+    for u in range(len(csr)):
+        for k in range(csr.indptr[u], csr.indptr[u + 1]):
+            rate = csr.weights[k]
+            if csr.indices[k] != u and rate > 0:
+                log_w[k] = shift - math.log(rate)
+                active[k] = 1  # Self-loops and missing quotes can never be part of a profitable cycle
+    return log_w, active
+
+
+def _predecessor_cycle(pred):
+    """Return a cycle in the predecessor graph as a forward node list, or None."""
+    owner = [-1] * len(pred)  # Node -> walk that first reached it
+    for start in range(len(pred)):
+        if owner[start] != -1 or pred[start] == -1:
+            continue
+        walk = []
+        node = start
+        while node != -1 and owner[node] == -1:
+            owner[node] = start
+            walk.append(node)
+            node = pred[node]
+        if node != -1 and owner[node] == start:
+            # The walk closed on itself: pred pointers run backwards, so reverse them
+            cycle = walk[walk.index(node):]
+            cycle.reverse()
+            return cycle
+    return None
+
+
+def find_negative_cycle(csr, log_w, active):
+    """
+    Find one negative-weight cycle using SPFA (queue-based Bellman-Ford).
+
+    Every node starts at distance 0, which is the same as relaxing from a
+    virtual source connected to all nodes. The predecessor graph is checked
+    for a cycle every n relaxations, so a cycle is reported as soon as it
+    forms instead of after n full passes.
+    """
+    indptr, indices = csr.indptr, csr.indices
+    n = len(csr)
+    dist = [0.0] * n
+    pred = [-1] * n
+    queue = deque(range(n))
+    in_queue = bytearray(b'\x01' * n)
+    relaxations = 0
+
+    while queue:
+        u = queue.popleft()
+        in_queue[u] = 0
+        du = dist[u]
+        start, end = indptr[u], indptr[u + 1]
+        for v, w, on in zip(indices[start:end], log_w[start:end], active[start:end]):
+            if on and du + w < dist[v] - EPSILON:
+                dist[v] = du + w
+                pred[v] = u
+                relaxations += 1
+                if relaxations % n == 0:
+                    cycle = _predecessor_cycle(pred)
+                    if cycle:
+                        metrics.count('edges_relaxed', relaxations)
+                        return cycle
+                if not in_queue[v]:
+                    queue.append(v)
+                    in_queue[v] = 1
+
+    metrics.count('edges_relaxed', relaxations)
+    return _predecessor_cycle(pred)
+
+
+def cycle_to_opportunity(cycle, factor):
+    """Split a cycle into the forward/reverse path record used by check_arbitrage."""
+    mid = len(cycle) // 2
+    return {
+        "arbitrage_factor": factor,
+        "forward_path": cycle[:mid + 1],
+        "reverse_path": cycle[mid:] + [cycle[0]]
+    }
+
+
+def canonical_cycle(cycle):
+    """Rotate a cycle so it starts at its smallest node, so the same cycle found twice gets one key."""
+    start = cycle.index(min(cycle))
+    return tuple(cycle[start:] + cycle[:start])
+
+
+def find_arbitrage_cycles(g, threshold=1.0006, top_k=10, max_hops=4, max_rounds=None):
+    """
+    Report the profitable cycles that repeated negative-cycle detection extracts.
+
+    Each round runs SPFA over -log(rate) weights shifted by
+    log(threshold) / max_hops, which keeps flat and losing cycles from being
+    negative. The cycle is recovered by walking the predecessor pointers, and
+    its weakest edge is switched off so the next round surfaces a different
+    one. The extracted cycles are deduplicated, scored on the original rates
+    and ranked by factor. Every round is O(V * E), so the scan is polynomial.
+
+    This is a fast heuristic, not a replacement for the exact searches. It is
+    not top-K exact, because switching an edge off also hides every other
+    cycle through it. It only finds simple cycles, so it never reports the
+    out-and-back round trips that the path scans (method='simple_paths')
+    score. Use method='branch_bound' or 'matrix' for the exact top-K of short
+    cycles.
+
+    Args:
+        g (CSRGraph or networkx.DiGraph): Exchange rate graph
+        threshold (float): Minimum round-trip factor worth reporting
+        top_k (int): Number of opportunities to return
+        max_hops (int): Cycle length the threshold shift is spread over
+        max_rounds (int): Detection rounds to run (defaults to 4 * top_k)
+
+    Returns:
+        list: Opportunity dicts sorted by arbitrage factor, highest first
+    """
+    csr = CSRGraph.coerce(g)  # Integer-indexed arrays for the relaxation loop
+    if not len(csr):
+        return []
+    log_w, active = log_weights(csr, shift=math.log(threshold) / max_hops)
+
+    found = {}  # Canonical cycle -> factor, so a cycle found twice is scored once
+    for _ in range(max_rounds or 4 * top_k):
+        cycle = find_negative_cycle(csr, log_w, active)
+        if cycle is None:
+            break  # No cycle left that could beat the threshold
+        edges = [csr.edge_id(cycle[i], cycle[(i + 1) % len(cycle)]) for i in range(len(cycle))]
+
+        key = canonical_cycle(cycle)
+        if key not in found:
+            factor = 1.0
+            for k in edges:
+                factor *= csr.weights[k]
+            found[key] = factor
+
+        # Break the cycle at the edge that contributes the least gain
+        active[max(edges, key=lambda k: log_w[k])] = 0
+
+    metrics.count('cycles_extracted', len(found))
+    top = TopK(top_k)
+    for cycle, factor in found.items():
+        if factor > threshold:
+            top.push(factor, cycle_to_opportunity([csr.nodes[i] for i in cycle], factor))
+    return top.items()
@@ -0,0 +1,144 @@
+import contextlib
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MockTradingClient:
+    """
+    Local stand-in for alpaca's TradingClient.
+
+    submit_order sleeps for a fixed round-trip latency and records the order,
+    so the submission pipeline can be benchmarked without an account.
+    """
+
+    def __init__(self, latency=0.05, fail_symbols=()):
+        self.latency = latency
+        self.fail_symbols = set(fail_symbols)
+        self.orders = []
+        self.lock = threading.Lock()
+
+    def submit_order(self, order_data):
+        time.sleep(self.latency)  # Simulated network round trip
+        if order_data.symbol in self.fail_symbols:
+            raise ValueError(f"asset {order_data.symbol} is not tradable")
+        with self.lock:
+            self.orders.append(order_data)
+        return order_data
+
+    def get_all_positions(self):
+        return []
+
+
+def net_legs(legs, tolerance=1e-9):
+    """
+    Collapse (symbol, qty, side) legs into one order per symbol.
+
+    Buys add to a symbol's signed notional and sells subtract from it.
+    Symbols whose legs cancel out are dropped. What is left becomes a single
+    buy or sell for the absolute net amount, in first-seen symbol order.
+
+    Args:
+        legs (list): (symbol, qty, side) tuples, side 'buy' or 'sell'
+        tolerance (float): Net amounts at or below this are treated as zero
+
+    Returns:
+        list: Netted (symbol, qty, side) legs
+    """
+    net = {}
+    for symbol, qty, side in legs:
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Unknown order side: {side}")
+        net[symbol] = net.get(symbol, 0.0) + (qty if side == 'buy' else -qty)
+    return [
+        (symbol, abs(amount), 'buy' if amount > 0 else 'sell')
+        for symbol, amount in net.items()
+        if abs(amount) > tolerance
+    ]
+
+
+def submit_concurrently(submit, legs, max_workers=8):
+    """
+    Run submit(symbol, qty, side) for every leg on a bounded thread pool.
+
+    Args:
+        submit (callable): Places one order and raises on failure
+        legs (list): (symbol, qty, side) tuples
+        max_workers (int): Maximum number of orders in flight at once
+
+    Returns:
+        list: One result dict per leg, in leg order, with submit latency in seconds
+    """
+    def run(leg):
+        symbol, qty, side = leg
+        start = time.perf_counter()
+        try:
+            submit(symbol, qty, side)
+            error = None
+        except Exception as e:
+            error = str(e)
+        return {
+            "symbol": symbol,
+            "qty": qty,
+            "side": side,
+            "ok": error is None,
+            "error": error,
+            "latency": time.perf_counter() - start
+        }
+
+    if not legs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(legs))) as pool:
+        return list(pool.map(run, legs))
+
+
+def benchmark_submission(n_legs=20, latency=0.05, max_workers=8):
+    """
+    Time sequential vs concurrent submission of n_legs orders through finalproject.submit_leg.
+
+    A MockTradingClient is injected as the trading client for the duration of
+    the run, so each leg goes through the real MarketOrderRequest and
+    submit_order path without an account.
+    """
+    import finalproject  # Imported here: finalproject itself imports this module
+    import alpaca.trading.requests  # noqa: F401 - load the SDK before timing, submit_leg imports it lazily
+
+    mock = MockTradingClient(latency=latency)
+    legs = [(f"SYM{i}", 100, 'buy' if i % 2 == 0 else 'sell') for i in range(n_legs)]
+
+    saved_client = finalproject.client
+    recorded = len(finalproject.successful_orders)
+    finalproject.client = mock
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # Drop the per-order confirmations
+            start = time.perf_counter()
+            submit_concurrently(finalproject.submit_leg, legs, max_workers=1)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = submit_concurrently(finalproject.submit_leg, legs, max_workers=max_workers)
+            concurrent = time.perf_counter() - start
+    finally:
+        finalproject.client = saved_client
+        with finalproject.successful_orders_lock:
+            del finalproject.successful_orders[recorded:]  # Benchmark orders are not real trades
+
+    failed = [result['error'] for result in results if not result['ok']]
+    if failed:
+        raise RuntimeError(f"Mock submission failed: {failed[0]}")
+
+    latencies = sorted(result['latency'] for result in results)
+    return {
+        "legs": n_legs,
+        "max_workers": max_workers,
+        "sequential_seconds": sequential,
+        "concurrent_seconds": concurrent,
+        "speedup": sequential / concurrent,
+        "p50_submit_latency": latencies[len(latencies) // 2],
+        "max_submit_latency": latencies[-1]
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark_submission())
@@ -0,0 +1,81 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from csr_graph import CSRGraph
+from instrumentation import metrics
+from negative_cycle import TopK
+
+# Per-worker graph, installed once by _init_worker instead of pickled per task
+_csr = None
+
+
+def _init_worker(csr):
+    """Keep the CSR graph shipped to this worker process."""
+    global _csr
+    _csr = csr
+
+
+def _search_sources(sources, threshold, top_k):
+    """
+    Score every simple path starting at the given sources, together with its reversal.
+
+    One DFS per source visits every simple path to every target, which is the
+    same set all_simple_paths produces pair by pair. Only the local top_k
+    survives, so results sent back to the parent stay small.
+    """
+    csr = _csr
+    best = TopK(top_k)
+    paths_enumerated = 0
+
+    for source in sources:
+        for path, forward in csr.simple_paths(source):
+            paths_enumerated += 1
+            if path[-1] < source:
+                continue  # A path and its reversal are the same round trip: score one orientation
+
+            reverse = csr.path_weight(path[::-1])  # None if an edge back is missing
+            if reverse is not None and forward * reverse > threshold:
+                best.push(forward * reverse, (forward * reverse, list(path)))
+
+    return [(factor, [csr.nodes[i] for i in path]) for factor, path in best.items()], paths_enumerated
+
+
+def find_path_opportunities_parallel(g, threshold=1.0006, top_k=10, workers=None, shards_per_worker=4):
+    """
+    Exhaustive simple-path arbitrage scan sharded by source node across processes.
+
+    The graph is packed into CSR arrays (unless it already is) and handed to each worker through
+    the pool initializer; tasks only carry lists of source indices. Each worker keeps
+    its own top_k and the parent merges them.
+
+    Args:
+        g (CSRGraph or networkx.DiGraph): Exchange rate graph
+        threshold (float): Minimum round-trip factor worth reporting
+        top_k (int): Number of opportunities to return
+        workers (int): Process count (defaults to os.cpu_count())
+        shards_per_worker (int): Source shards per worker, for load balancing
+
+    Returns:
+        list: Opportunity dicts sorted by arbitrage factor, highest first
+    """
+    csr = CSRGraph.coerce(g)
+    workers = workers or os.cpu_count() or 1
+    n_shards = max(1, min(len(csr), workers * shards_per_worker))
+    shards = [list(range(i, len(csr), n_shards)) for i in range(n_shards)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csr,)) as pool:
+        for local, paths_enumerated in pool.map(_search_sources, shards, [threshold] * n_shards, [top_k] * n_shards):
+            results.extend(local)
+            metrics.count('paths_enumerated', paths_enumerated)
+
+    results = heapq.nlargest(top_k, results, key=lambda item: item[0])
+    return [
+        {
+            "arbitrage_factor": factor,
+            "forward_path": path,
+            "reverse_path": list(reversed(path))
+        }
+        for factor, path in results
+    ]
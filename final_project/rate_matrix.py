@@ -0,0 +1,167 @@
+import numpy as np
+
+from csr_graph import CSRGraph
+from negative_cycle import cycle_to_opportunity
+
+
+class RateMatrix:
+    """
+    Dense, index-mapped view of one rate snapshot.
+
+    rates[i, j] is the rate for converting tickers[i] into tickers[j] (0.0 when
+    there is no quote) and log_rates holds log(rates) with -inf for missing
+    quotes. Self-rates are zeroed so a cycle can never stall on one node.
+    """
+
+    def __init__(self, tickers, rates):
+        self.tickers = list(tickers)
+        self.index = {tkr: i for i, tkr in enumerate(self.tickers)}
+        self.rates = np.asarray(rates, dtype=np.float64)
+        np.fill_diagonal(self.rates, 0.0)
+        with np.errstate(divide='ignore'):
+            self.log_rates = np.log(self.rates)
+
+    @classmethod
+    def from_graph(cls, g):
+        """Build the matrix once from a CSRGraph (or a networkx rate graph)."""
+        csr = CSRGraph.coerce(g)
+        tickers = sorted(csr.nodes)
+        index = {tkr: i for i, tkr in enumerate(tickers)}
+        rates = np.zeros((len(tickers), len(tickers)))
+        for u in range(len(csr)):
+            for v, rate in csr.neighbors(u):
+                rates[index[csr.nodes[u]], index[csr.nodes[v]]] = rate
+        return cls(tickers, rates)
+
+    def __len__(self):
+        return len(self.tickers)
+
+
+def _select(block, threshold, top_k):
+    """Return indices of block entries above threshold, keeping at most top_k."""
+    flat = block.ravel()
+    if top_k is not None and flat.size > top_k:
+        candidates = np.argpartition(flat, -top_k)[-top_k:]
+    else:
+        candidates = np.arange(flat.size)
+    candidates = candidates[flat[candidates] > threshold]
+    return np.column_stack(np.unravel_index(candidates, block.shape)), flat[candidates]
+
+
+# Largest 4-hop block scored at once (float64 entries), which bounds peak memory per chunk
+CHUNK_ELEMENTS = 1 << 22
+
+
+def _four_hop_cycles(R, threshold, top_k, chunk_elements=CHUNK_ELEMENTS):
+    """
+    Score every 4-hop cycle i -> j -> k -> l -> i (i the smallest index) without a dense n^3 block.
+
+    Per start i, the two-hop products first[j, k] = R[i, j] * R[j, k] and
+    second[k, l] = R[k, l] * R[l, i] are built once. A cycle through middle
+    node k is first[j, k] * second[k, l], so max_j first[:, k] * max_l
+    second[k, :] bounds every cycle through k, and middle nodes whose bound
+    cannot beat the current floor are skipped. The surviving middle nodes
+    are scored in chunks of at most chunk_elements entries, with
+    argpartition per chunk, and the floor rises to the running top_k as
+    cycles are found.
+    """
+    n = len(R)
+    floor = threshold
+    cycles = []
+    factors = []
+    for i in range(n - 3):
+        rest = np.arange(i + 1, n)
+        m = len(rest)
+        S = R[np.ix_(rest, rest)]
+        first = R[i, rest][:, None] * S   # [j, k]
+        second = S * R[rest, i][None, :]  # [k, l]
+        bound = first.max(axis=0) * second.max(axis=1)
+        middles = np.flatnonzero(bound > floor)
+        step = max(1, chunk_elements // (m * m))
+
+        for c in range(0, len(middles), step):
+            ks = middles[c:c + step]
+            block = first[:, ks].T[:, :, None] * second[ks][:, None, :]  # [k, j, l]
+            block[:, np.arange(m), np.arange(m)] = 0.0  # j -> k -> j revisits a node
+            hits, block_factors = _select(block, floor, top_k)
+            if not len(hits):
+                continue
+            k, j, l = rest[ks[hits[:, 0]]], rest[hits[:, 1]], rest[hits[:, 2]]
+            cycles.append(np.column_stack([np.full(len(hits), i), j, k, l]))
+            factors.append(block_factors)
+
+            if top_k is not None:
+                # Keep only the running top_k and raise the floor to the worst of them
+                all_factors = np.concatenate(factors)
+                if len(all_factors) >= top_k:
+                    keep = np.argpartition(all_factors, -top_k)[-top_k:]
+                    cycles = [np.concatenate(cycles)[keep]]
+                    factors = [all_factors[keep]]
+                    floor = max(floor, factors[0].min())
+
+    if not cycles:
+        return np.empty((0, 4), dtype=np.intp), np.empty(0)
+    return np.concatenate(cycles), np.concatenate(factors)
+
+
+def score_cycles(matrix, hops, threshold=1.0006, top_k=None):
+    """
+    Score every simple cycle of exactly `hops` edges with broadcast products.
+
+    Each cycle is produced once, rotated so its smallest index comes first.
+    Work is batched per start index i over the sub-matrix of indices > i.
+    Three hops use O(n^2) memory per batch; four hops are scored from
+    two-hop products in bounded chunks (see _four_hop_cycles).
+
+    Args:
+        matrix (RateMatrix): Snapshot to score
+        hops (int): Cycle length, 2, 3 or 4
+        threshold (float): Minimum round-trip factor to keep
+        top_k (int): Keep only the best top_k cycles (None keeps all)
+
+    Returns:
+        tuple: (cycles, factors) where cycles is an (m, hops) index array
+    """
+    if hops not in (2, 3, 4):
+        raise ValueError(f"Vectorized scoring supports 2-4 hops, got {hops}")
+
+    R = matrix.rates
+    n = len(matrix)
+
+    if hops == 2:
+        # factor[i, j] = R[i, j] * R[j, i], kept for i < j
+        return _select(np.triu(R * R.T, k=1), threshold, top_k)
+    if hops == 4:
+        return _four_hop_cycles(R, threshold, top_k)
+
+    cycles = []
+    factors = []
+    for i in range(n - hops + 1):
+        rest = np.arange(i + 1, n)
+        S = R[np.ix_(rest, rest)]
+
+        # block[j, k] = R[i, j] * R[j, k] * R[k, i]
+        block = R[i, rest][:, None] * S * R[rest, i][None, :]
+
+        hits, block_factors = _select(block, threshold, top_k)
+        if len(hits):
+            factors.append(block_factors)
+            cycles.append(np.column_stack([np.full(len(hits), i), rest[hits]]))
+
+    if not cycles:
+        return np.empty((0, hops), dtype=np.intp), np.empty(0)
+    return np.concatenate(cycles), np.concatenate(factors)
+
+
+def find_short_cycles(matrix, max_hops=4, threshold=1.0006, top_k=10):
+    """Score every 2..max_hops round trip and return the top opportunity records."""
+    all_cycles = []
+    for hops in range(2, max_hops + 1):
+        cycles, factors = score_cycles(matrix, hops, threshold, top_k)
+        all_cycles.extend(zip(factors.tolist(), cycles.tolist()))
+
+    all_cycles.sort(key=lambda item: item[0], reverse=True)
+    return [
+        cycle_to_opportunity([matrix.tickers[i] for i in cycle], factor)
+        for factor, cycle in all_cycles[:top_k]
+    ]
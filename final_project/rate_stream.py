@@ -0,0 +1,128 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def make_session(pool_size=4):
+    """Create a requests session that keeps its TCP/TLS connections alive between polls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def poll_rates(url, interval=10.0, session=None, max_backoff=300.0, max_ticks=None, timeout=10.0, sleep=time.sleep):
+    """
+    Poll a rate endpoint forever and yield (timestamp, data) for each new snapshot.
+
+    Requests are conditional (If-None-Match / If-Modified-Since), so an
+    unchanged snapshot costs a 304 and is not yielded. Errors, 429s and 5xx
+    responses back off exponentially up to max_backoff seconds.
+
+    Args:
+        url (str): Price endpoint, e.g. the CoinGecko simple/price URL
+        interval (float): Seconds between successful polls
+        session (requests.Session): Pooled session to reuse (created if None)
+        max_backoff (float): Upper bound on the retry delay
+        max_ticks (int): Stop after this many requests (None polls forever)
+        timeout (float): Per-request timeout in seconds
+        sleep (callable): Sleep function, swappable for replay and benchmarks
+
+    Yields:
+        tuple: (unix timestamp of receipt, decoded JSON snapshot)
+    """
+    session = session or make_session()
+    etag = None
+    last_modified = None
+    failures = 0
+    ticks = 0
+
+    while max_ticks is None or ticks < max_ticks:
+        started = time.monotonic()
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"Error polling rates: {str(e)}")  # Network failure, back off below
+            response = None
+        ticks += 1
+
+        if response is not None and response.status_code == 200:
+            failures = 0
+            etag = response.headers.get('ETag', etag)
+            last_modified = response.headers.get('Last-Modified', last_modified)
+            yield time.time(), response.json()
+        elif response is not None and response.status_code == 304:
+            failures = 0  # Nothing changed since the last snapshot
+        else:
+            failures += 1
+            if response is not None:
+                print(f"Rate poll failed with status {response.status_code}")
+
+        delay = min(interval * 2 ** failures, max_backoff) if failures else interval
+        remaining = delay - (time.monotonic() - started)  # Keep a steady cadence
+        if remaining > 0 and (max_ticks is None or ticks < max_ticks):
+            sleep(remaining)
+
+
+class _SnapshotHandler(BaseHTTPRequestHandler):
+    """Serve the server's current snapshot with ETag support."""
+
+    def do_GET(self):
+        body, etag = self.server.current()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output quiet
+
+
+class SnapshotServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the CoinGecko price endpoint.
+
+    Each request serves the next snapshot from the list (the last one repeats),
+    so pollers and detectors can be timed without touching the network.
+    """
+
+    def __init__(self, snapshots, port=0):
+        super().__init__(('127.0.0.1', port), _SnapshotHandler)
+        self.snapshots = list(snapshots)
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        with self.lock:
+            snapshot = self.snapshots[min(self.position, len(self.snapshots) - 1)]
+            self.position += 1
+        body = json.dumps(snapshot).encode()
+        return body, '"' + hashlib.md5(body).hexdigest() + '"'
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/api/v3/simple/price'
+
+    def start(self):
+        """Serve requests from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from history_store import RateHistory
+
+
+def load_coin_map(directory):
+    """Return the name -> ticker map of a rate history file or a snapshot directory's coins.txt (None if absent)."""
+    if os.path.isfile(directory):
+        return RateHistory(directory).coin_map()  # History files carry their own header
+    path = os.path.join(directory, 'coins.txt')
+    if not os.path.exists(path):
+        return None
+    from batch_fetch import load_coins  # Deferred like finalproject: batch_fetch pulls in requests
+    return load_coins(path)
+
+
+def load_snapshots(directory):
+    """Yield (name, data) for every recorded snapshot in a JSON folder or a rate history file."""
+    if os.path.isfile(directory):
+        for timestamp, data in RateHistory(directory).iter_snapshots():
+            yield str(timestamp), data
+        return
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, 'r') as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            yield os.path.basename(path), data  # Skip results.json-style lists
+
+
+def generate_snapshots(directory, n_coins, n_snapshots=10, noise=0.002, seed=0):
+    """
+    Write n_snapshots synthetic simple/price responses for n_coins into directory.
+
+    Coin 0 is always bitcoin/btc so the reachability check has its start node.
+    Each snapshot perturbs the fair cross rates by up to +/- noise, which is
+    enough to create the small mispricings the detector looks for.
+
+    Returns:
+        dict: The coin name -> ticker map, also written to coins.txt
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    coin_map = {'bitcoin': 'btc'}
+    for i in range(1, n_coins):
+        coin_map[f'coin-{i}'] = f'c{i}'
+    prices = {tkr: rng.uniform(0.01, 1000.0) for tkr in coin_map.values()}
+
+    with open(os.path.join(directory, 'coins.txt'), 'w') as file:
+        for name, tkr in coin_map.items():
+            file.write(f'{name},{tkr}\n')
+
+    for s in range(n_snapshots):
+        for tkr in prices:
+            prices[tkr] *= rng.uniform(0.99, 1.01)  # Random walk between ticks
+        data = {
+            name: {
+                tkr: prices[coin] / prices[tkr] * (1.0 if tkr == coin else rng.uniform(1 - noise, 1 + noise))
+                for tkr in coin_map.values()
+            }
+            for name, coin in coin_map.items()
+        }
+        with open(os.path.join(directory, f'snapshot_{s:06d}.json'), 'w') as file:
+            json.dump(data, file)
+    return coin_map
+
+
+def replay(directory, method, output_dir=None):
+    """
+    Drive build_graph -> check_arbitrage -> save_arbitrage_pairs_to_csv over recorded snapshots.
+
+    Snapshots are fed back to back with no network or Alpaca calls. Console
+    output from the pipeline is discarded and its files go to output_dir (a
+    temporary directory by default) so the recorded data is never overwritten.
+
+    Args:
+        directory (str): Folder of simple/price JSON snapshots (optionally with coins.txt),
+            or a RateHistory file
+        method (str): check_arbitrage method to benchmark (one of finalproject.METHODS);
+            there is no default because the exhaustive default search does not scale
+        output_dir (str): Where data/results.json and the CSVs are written (kept);
+            by default they go to a temporary directory that is removed afterwards
+
+    Returns:
+        dict: Throughput, per-stage timings and the opportunities found per snapshot
+    """
+    import finalproject  # Deferred so the generator works without the trading stack
+
+    coin_map = load_coin_map(directory)
+    stages = {'load': 0.0, 'build_graph': 0.0, 'check_arbitrage': 0.0, 'save_csv': 0.0}
+    found = []
+    start_dir = os.getcwd()
+    scratch = None
+    if output_dir is None:
+        scratch = tempfile.TemporaryDirectory(prefix='replay_')  # Removed once the replay is done
+        output_dir = scratch.name
+
+    started = time.perf_counter()
+    os.chdir(output_dir)
+    try:
+        snapshots = load_snapshots(os.path.join(start_dir, directory))
+        while True:
+            t0 = time.perf_counter()
+            name, data = next(snapshots, (None, None))
+            t1 = time.perf_counter()
+            if name is None:
+                break
+            with contextlib.redirect_stdout(io.StringIO()):
+                g = finalproject.build_graph(data, coin_map)
+                t2 = time.perf_counter()
+                opportunities = finalproject.check_arbitrage(g, method=method)
+                t3 = time.perf_counter()
+                finalproject.save_arbitrage_pairs_to_csv(opportunities)
+                t4 = time.perf_counter()
+
+            stages['load'] += t1 - t0
+            stages['build_graph'] += t2 - t1
+            stages['check_arbitrage'] += t3 - t2
+            stages['save_csv'] += t4 - t3
+            found.append({
+                "snapshot": name,
+                "count": len(opportunities),
+                "best_factor": opportunities[0]['arbitrage_factor'] if opportunities else None
+            })
+    finally:
+        os.chdir(start_dir)
+        if scratch is not None:
+            scratch.cleanup()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "method": method,
+        "snapshots": len(found),
+        "seconds": elapsed,
+        "snapshots_per_second": len(found) / elapsed if elapsed else 0.0,
+        "stage_seconds": stages,
+        "stage_mean_ms": {stage: total * 1000 / max(len(found), 1) for stage, total in stages.items()},
+        "opportunities": found
+    }
+
+
+def benchmark_scaling(method, sizes=(10, 25, 50, 100, 250, 500), n_snapshots=5):
+    """Generate synthetic snapshots for each coin count and replay them, one report per size."""
+    reports = []
+    for n_coins in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            generate_snapshots(directory, n_coins, n_snapshots=n_snapshots)
+            report = replay(directory, method=method)
+        report.pop('opportunities')
+        report['coins'] = n_coins
+        reports.append(report)
+        print(f"{n_coins:>4} coins: {report['snapshots_per_second']:.2f} snapshots/s, "
+              f"check_arbitrage {report['stage_mean_ms']['check_arbitrage']:.2f} ms/snapshot")
+    return reports
+
+
+if __name__ == "__main__":
+    from finalproject import METHODS
+
+    parser = argparse.ArgumentParser(description="Replay recorded rate snapshots through the arbitrage pipeline")
+    parser.add_argument('directory', nargs='?', help="Folder of recorded simple/price JSON snapshots or a .ratehist file")
+    parser.add_argument('--method', required=True, choices=METHODS,
+                        help="check_arbitrage method; simple_paths and parallel are exhaustive and only fit small coin sets")
+    parser.add_argument('--scaling', type=int, nargs='*', help="Benchmark synthetic snapshots for these coin counts")
+    args = parser.parse_args()
+
+    if args.scaling is not None:
+        print(json.dumps(benchmark_scaling(args.method, args.scaling or (10, 25, 50, 100, 250, 500)), indent=4))
+    elif args.directory:
+        print(json.dumps(replay(args.directory, method=args.method), indent=4))
+    else:
+        parser.error("give a snapshot directory or --scaling")
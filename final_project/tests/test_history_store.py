@@ -0,0 +1,55 @@
+import pytest
+
+import finalproject
+from history_store import CoinMismatchError, RateHistory
+
+OLD_COINS = {'bitcoin': 'btc', 'ethereum': 'eth'}
+NEW_COINS = {'bitcoin': 'btc', 'ethereum': 'eth', 'litecoin': 'ltc'}
+DATA = {
+    'bitcoin': {'btc': 1.0, 'eth': 20.0, 'ltc': 400.0},
+    'ethereum': {'btc': 0.05, 'eth': 1.0, 'ltc': 20.0},
+    'litecoin': {'btc': 0.0025, 'eth': 0.05, 'ltc': 1.0},
+}
+
+
+def test_existing_file_with_other_coins_is_rejected(tmp_path):
+    path = str(tmp_path / 'rates.ratehist')
+    RateHistory(path, OLD_COINS).append(DATA, 1.0)
+
+    with pytest.raises(CoinMismatchError):
+        RateHistory(path, NEW_COINS)
+
+    # Same coins in another order, or no coin_map at all, still open the file
+    assert len(RateHistory(path, {'ethereum': 'eth', 'bitcoin': 'btc'})) == 1
+    assert RateHistory(path).coin_map() == OLD_COINS
+
+
+def test_open_history_starts_a_new_file_for_a_new_coin_set(tmp_path):
+    path = str(tmp_path / 'rates.ratehist')
+    finalproject.open_history(path, OLD_COINS).append(DATA, 1.0)
+
+    history = finalproject.open_history(path, NEW_COINS)
+    history.append(DATA, 2.0)
+
+    _, data = next(RateHistory(path).iter_snapshots())
+    assert data['litecoin'] == {'btc': 0.0025, 'eth': 0.05, 'ltc': 1.0}
+    assert data['ethereum']['ltc'] == 20.0
+
+    archived = [p for p in tmp_path.iterdir() if p.name != 'rates.ratehist']
+    assert len(archived) == 1 and archived[0].suffix == '.ratehist'
+    assert RateHistory(str(archived[0])).coin_map() == OLD_COINS
+
+
+def test_out_of_order_snapshot_is_skipped(tmp_path, capsys):
+    path = str(tmp_path / 'rates.ratehist')
+    history = RateHistory(path, OLD_COINS)
+    assert history.append(DATA, 2.0)
+    assert not history.append(DATA, 1.0)  # Clock stepped back: reported, not raised
+    assert "Skipping out-of-order snapshot" in capsys.readouterr().out
+
+    # A reopened file picks the last timestamp up from its records
+    reopened = RateHistory(path)
+    assert reopened.last_timestamp == 2.0
+    assert not reopened.append(DATA, 1.5)
+    assert reopened.append(DATA, 3.0)
+    assert [timestamp for timestamp, _ in RateHistory(path).iter_snapshots()] == [2.0, 3.0]
@@ -0,0 +1,123 @@
+import requests
+
+import finalproject
+from rate_stream import SnapshotServer, make_session, poll_rates
+
+
+def snapshot(btc_eth, eth_btc):
+    """Two-coin simple/price response; the round trip pays btc_eth * eth_btc."""
+    return {
+        'bitcoin': {'btc': 1.0, 'eth': btc_eth},
+        'ethereum': {'btc': eth_btc, 'eth': 1.0},
+    }
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Replays a script of responses (or exceptions) and records the request headers."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_poll_rates_skips_unchanged_snapshots():
+    first = snapshot(20.0, 0.05)
+    second = snapshot(20.1, 0.05)
+    server = SnapshotServer([first, first, first, second]).start()
+    try:
+        sleeps = []
+        ticks = list(poll_rates(server.url, interval=0.5, session=make_session(), max_ticks=4, sleep=sleeps.append))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # The two repeats come back as 304s and are not yielded
+    assert [data for _, data in ticks] == [first, second]
+    assert server.position == 4
+    assert len(sleeps) == 3
+
+
+def test_poll_rates_sends_conditional_headers():
+    session = FakeSession([
+        FakeResponse(200, snapshot(20.0, 0.05), {'ETag': '"v1"', 'Last-Modified': 'Sat, 17 Oct 2026 10:00:00 GMT'}),
+        FakeResponse(304),
+    ])
+    ticks = list(poll_rates('http://rates.test', session=session, max_ticks=2, sleep=lambda seconds: None))
+
+    assert len(ticks) == 1
+    assert session.requests[0] == {}
+    assert session.requests[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Sat, 17 Oct 2026 10:00:00 GMT'}
+
+
+def test_poll_rates_backs_off_exponentially_and_resets(capsys):
+    session = FakeSession([
+        requests.ConnectionError("down"),
+        FakeResponse(500),
+        FakeResponse(429),
+        FakeResponse(503),
+        FakeResponse(200, snapshot(20.0, 0.05)),
+        FakeResponse(304),
+    ])
+    sleeps = []
+    ticks = list(poll_rates('http://rates.test', interval=1.0, max_backoff=5.0, session=session,
+                            max_ticks=6, sleep=sleeps.append))
+
+    assert len(ticks) == 1
+    # 2, 4, 8 capped at 5, then back to the plain interval after a success
+    assert [round(seconds) for seconds in sleeps] == [2, 4, 5, 5, 1]
+    assert "Rate poll failed with status 500" in capsys.readouterr().out
+
+
+def test_stream_arbitrage_ranks_each_new_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The stream records history under ./data
+    profitable = snapshot(20.0, 0.0505)  # 1.01 round trip
+    flat = snapshot(20.0, 0.05)
+    server = SnapshotServer([profitable, profitable, flat]).start()
+    try:
+        ticks = list(finalproject.stream_arbitrage(interval=0.0, max_ticks=3, url=server.url, session=make_session()))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(ticks) == 2  # The repeated snapshot is a 304
+    (_, first, first_latency), (_, second, second_latency) = ticks
+    assert [round(o['arbitrage_factor'], 6) for o in first] == [1.01]
+    assert set(first[0]['forward_path']) == {'btc', 'eth'}
+    assert second == []
+
+    # Tick-to-decision latency stays far below a polling interval
+    for latency in (first_latency, second_latency):
+        assert 0 <= latency < 1.0
+    assert (tmp_path / 'data' / 'rates.ratehist').exists()
+
+
+def test_stream_arbitrage_starts_from_empty_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profitable = snapshot(20.0, 0.0505)
+    server = SnapshotServer([{}, profitable]).start()
+    try:
+        ticks = list(finalproject.stream_arbitrage(interval=0.0, max_ticks=2, url=server.url, session=make_session()))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Nothing to rank on the empty snapshot; the first real quotes rebuild the detector
+    assert [top for _, top, _ in ticks][0] == []
+    assert [round(o['arbitrage_factor'], 6) for o in ticks[1][1]] == [1.01]
@@ -0,0 +1,276 @@
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from DeckofCards import DeckOfCards
+from play_game import calculate_score
+
+
+class Rules():
+    def __init__(self, decks=6, penetration=0.75, hit_soft_17=False, blackjack_payout=1.5, double_allowed=True):
+        self.decks = decks
+        self.penetration = penetration  # fraction of the shoe dealt before a reshuffle
+        self.hit_soft_17 = hit_soft_17
+        self.blackjack_payout = blackjack_payout
+        self.double_allowed = double_allowed
+
+    def __str__(self):
+        return (str(self.decks) + " decks, " + str(int(self.penetration * 100)) + "% penetration, "
+                + ("H17" if self.hit_soft_17 else "S17") + ", blackjack pays " + str(self.blackjack_payout))
+
+
+class Shoe(DeckOfCards):
+    # several decks shuffled together, using its own random generator instead of the global one
+    def __init__(self, decks, penetration, rng):
+        super().__init__()
+        self.deck = self.deck * decks
+        self.rng = rng
+        self.cut = int(len(self.deck) * penetration)
+        self.shuffles = 0
+        self.shuffle_deck()
+
+    def shuffle_deck(self):
+        self.rng.shuffle(self.deck)
+        self.play_idx = 0
+        self.shuffles += 1
+
+    def needs_shuffle(self):
+        return self.play_idx >= self.cut
+
+    def get_card(self):
+        # only reached mid-hand when the cut card is placed very deep
+        if self.play_idx == len(self.deck):
+            self.shuffle_deck()
+        return super().get_card()
+
+
+def hand_total(cards):
+    # score from calculate_score, plus whether an ace is still counted as 11
+    score = calculate_score(cards)
+    aces = 0
+    raw = 0
+    for card in cards:
+        raw += card.value
+        if card.face == 'Ace':
+            aces += 1
+    return score, (raw - score) // 10 < aces
+
+
+# Player policies: policy(score, soft, dealer_value, can_double) returns 'hit', 'stand' or 'double'.
+# dealer_value is the dealer's up card value (Ace is 11).
+
+def mimic_dealer(score, soft, dealer_value, can_double):
+    return 'hit' if score < 17 else 'stand'
+
+
+def never_bust(score, soft, dealer_value, can_double):
+    return 'hit' if score < 12 or (soft and score < 18) else 'stand'
+
+
+def basic_strategy(score, soft, dealer_value, can_double):
+    # basic strategy without splits, for multi-deck games
+    if soft:
+        if score >= 19:
+            return 'stand'
+        if score == 18:
+            if 3 <= dealer_value <= 6:
+                return 'double' if can_double else 'stand'
+            return 'stand' if dealer_value <= 8 else 'hit'
+        low = {17: 3, 16: 4, 15: 4, 14: 5, 13: 5}.get(score, 7)  # soft 12 (two aces) just hits
+        if can_double and low <= dealer_value <= 6:
+            return 'double'
+        return 'hit'
+
+    if score >= 17:
+        return 'stand'
+    if score >= 13:
+        return 'stand' if dealer_value <= 6 else 'hit'
+    if score == 12:
+        return 'stand' if 4 <= dealer_value <= 6 else 'hit'
+    if can_double and (score == 11 and dealer_value <= 10
+                       or score == 10 and dealer_value <= 9
+                       or score == 9 and 3 <= dealer_value <= 6):
+        return 'double'
+    return 'hit'
+
+
+POLICIES = {
+    'basic': basic_strategy,
+    'mimic-dealer': mimic_dealer,
+    'never-bust': never_bust,
+}
+
+
+def dealer_plays(shoe, dealer_hand, rules):
+    score, soft = hand_total(dealer_hand)
+    while score < 17 or (score == 17 and soft and rules.hit_soft_17):
+        dealer_hand.append(shoe.get_card())
+        score, soft = hand_total(dealer_hand)
+    return score
+
+
+def play_hand(shoe, policy, rules):
+    # plays one hand for a 1 unit bet and returns the player's net result in units
+    if shoe.needs_shuffle():
+        shoe.shuffle_deck()
+
+    # deal two cards to the player, then two to the dealer, like play_game does
+    player_hand = [shoe.get_card(), shoe.get_card()]
+    dealer_hand = [shoe.get_card(), shoe.get_card()]
+    score, soft = hand_total(player_hand)
+    dealer_score = calculate_score(dealer_hand)
+
+    # dealer checks for blackjack before the player acts
+    if score == 21 or dealer_score == 21:
+        if score == dealer_score:
+            return 0.0
+        return rules.blackjack_payout if score == 21 else -1.0
+
+    bet = 1.0
+    dealer_value = dealer_hand[0].value
+    while score < 21:
+        action = policy(score, soft, dealer_value, rules.double_allowed and len(player_hand) == 2)
+        if action == 'stand':
+            break
+        player_hand.append(shoe.get_card())
+        score, soft = hand_total(player_hand)
+        if action == 'double':
+            bet = 2.0
+            break
+
+    if score > 21:
+        return -bet
+
+    dealer_score = dealer_plays(shoe, dealer_hand, rules)
+    if dealer_score > 21 or score > dealer_score:
+        return bet
+    if score < dealer_score:
+        return -bet
+    return 0.0
+
+
+def new_counts():
+    return {'hands': 0, 'wins': 0, 'losses': 0, 'pushes': 0, 'net': 0.0, 'net_squared': 0.0, 'shuffles': 0}
+
+
+def simulate_batch(hands, seed, policy='basic', rules=None):
+    # one batch on a fresh shoe; the seed string gives every batch its own random stream
+    rules = rules or Rules()
+    policy = POLICIES[policy] if isinstance(policy, str) else policy
+    shoe = Shoe(rules.decks, rules.penetration, random.Random(seed))
+    counts = new_counts()
+    net = 0.0
+    net_squared = 0.0
+    wins = losses = 0
+    for _ in range(hands):
+        result = play_hand(shoe, policy, rules)
+        net += result
+        net_squared += result * result
+        if result > 0:
+            wins += 1
+        elif result < 0:
+            losses += 1
+    counts['hands'] = hands
+    counts['wins'] = wins
+    counts['losses'] = losses
+    counts['pushes'] = hands - wins - losses
+    counts['net'] = net
+    counts['net_squared'] = net_squared
+    counts['shuffles'] = shoe.shuffles
+    return counts
+
+
+def merge_counts(batches):
+    total = new_counts()
+    for counts in batches:
+        for key in total:
+            total[key] += counts[key]
+    return total
+
+
+def summarize(counts, seconds, z=1.96):
+    n = counts['hands']
+    ev = counts['net'] / n
+    variance = (counts['net_squared'] - n * ev * ev) / (n - 1) if n > 1 else 0.0
+    margin = z * math.sqrt(max(variance, 0.0) / n)
+    return {
+        'hands': n,
+        'win_rate': counts['wins'] / n,
+        'loss_rate': counts['losses'] / n,
+        'push_rate': counts['pushes'] / n,
+        'ev': ev,
+        'ev_low': ev - margin,
+        'ev_high': ev + margin,
+        'std_dev': math.sqrt(max(variance, 0.0)),
+        'seconds': seconds,
+        'hands_per_second': n / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def run_simulation(hands, policy='basic', rules=None, seed=None, batch_size=100000, workers=None):
+    # splits the hands into batches, runs them on a process pool and merges the counts.
+    # Batches are seeded from (seed, batch number), so a given seed gives the same
+    # result however many workers are used.
+    rules = rules or Rules()
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    sizes = [batch_size] * (hands // batch_size)
+    if hands % batch_size:
+        sizes.append(hands % batch_size)
+    seeds = [str(seed) + ":" + str(i) for i in range(len(sizes))]
+
+    start = time.perf_counter()
+    if workers == 1 or len(sizes) == 1:
+        batches = [simulate_batch(size, batch_seed, policy, rules) for size, batch_seed in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(simulate_batch, sizes, seeds, [policy] * len(sizes), [rules] * len(sizes)))
+    seconds = time.perf_counter() - start
+
+    summary = summarize(merge_counts(batches), seconds)
+    summary['seed'] = seed
+    summary['batches'] = len(sizes)
+    return summary
+
+
+def print_summary(summary, policy, rules):
+    print("Policy:", policy)
+    print("Rules:", rules)
+    print("Hands played:", summary['hands'], "in", summary['batches'], "batches (seed " + str(summary['seed']) + ")")
+    print("Win rate:  {:.4%}".format(summary['win_rate']))
+    print("Loss rate: {:.4%}".format(summary['loss_rate']))
+    print("Push rate: {:.4%}".format(summary['push_rate']))
+    print("Expected value per hand: {:+.5f} units (95% CI {:+.5f} to {:+.5f})".format(
+        summary['ev'], summary['ev_low'], summary['ev_high']))
+    print("Hands per second: {:,.0f} ({:.2f}s)".format(summary['hands_per_second'], summary['seconds']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless blackjack Monte Carlo simulation")
+    parser.add_argument('--hands', type=int, default=1000000, help="number of hands to play")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='basic', help="player policy")
+    parser.add_argument('--decks', type=int, default=6, help="decks in the shoe")
+    parser.add_argument('--penetration', type=float, default=0.75, help="fraction of the shoe dealt before reshuffling")
+    parser.add_argument('--h17', action='store_true', help="dealer hits soft 17")
+    parser.add_argument('--payout', type=float, default=1.5, help="blackjack payout")
+    parser.add_argument('--no-double', action='store_true', help="do not allow doubling down")
+    parser.add_argument('--seed', type=int, help="base seed (random if not given)")
+    parser.add_argument('--batch-size', type=int, default=100000, help="hands per batch")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.penetration <= 1:
+        parser.error("--penetration must be between 0 and 1")
+    if args.hands < 1 or args.batch_size < 1 or args.decks < 1:
+        parser.error("--hands, --batch-size and --decks must be positive")
+
+    rules = Rules(args.decks, args.penetration, args.h17, args.payout, not args.no_double)
+    summary = run_simulation(args.hands, args.policy, rules, args.seed, args.batch_size, args.workers)
+    print_summary(summary, args.policy, rules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Import necessary libraries
+import numpy as np  # For vectorized group-by
+
+# Per-month reducers; add a NumPy ufunc here to get another monthly table for every metric
+MONTHLY_REDUCERS = {
+    'sum': np.add,
+    'min': np.minimum,
+    'max': np.maximum,
+}
+
+
+def format_date(yyyymmdd):
+    """
+    Format a YYYYMMDD integer as YYYY-MM-DD using integer arithmetic only.
+
+    :param yyyymmdd: Date such as 20210307
+    :return: Date string such as '2021-03-07'
+    """
+    yyyymmdd = int(yyyymmdd)
+    return f"{yyyymmdd // 10000}-{yyyymmdd // 100 % 100:02d}-{yyyymmdd % 100:02d}"
+
+
+def format_month(yyyymm):
+    """
+    Format a YYYYMM integer as YYYY-MM.
+
+    :param yyyymm: Month such as 202103
+    :return: Month string such as '2021-03'
+    """
+    yyyymm = int(yyyymm)
+    return f"{yyyymm // 100}-{yyyymm % 100:02d}"
+
+
+def _first_extreme(values, first_seen, pick):
+    """
+    Index of the extreme value, breaking ties by earliest first appearance.
+
+    :param values: Per-group values
+    :param first_seen: Record position where each group first appears
+    :param pick: np.max or np.min
+    :return: Index into values
+    """
+    candidates = np.flatnonzero(values == pick(values))
+    return candidates[np.argmin(first_seen[candidates])]
+
+
+def aggregate(columns, metrics=('positiveIncrease',)):
+    """
+    Compute per-state statistics for one or more metric columns in a single vectorized pass.
+
+    Months are taken from the YYYYMMDD date column as date // 100, and every
+    monthly table is built with one ufunc.reduceat over the rows grouped by
+    month. Null values (NaN) count as 0 for the sums and the maximum, but are
+    left out of the mean. Ties go to the record that comes first, which
+    matches max()/min() over the original list of dictionaries.
+
+    :param columns: Dictionary of column arrays with 'date' plus the metric columns
+        (see columnar.load_state_columns or columnar.records_to_columns)
+    :param metrics: Names of the metric columns to summarize
+    :return: Dictionary with 'days', 'months' (YYYYMM ints, ascending) and one summary per metric
+    """
+    dates = np.asarray(columns['date'], dtype=np.int64)
+    n = len(dates)
+    result = {'days': n, 'months': np.zeros(0, dtype=np.int64)}
+    if n == 0:
+        return result
+
+    # Group rows by month once and share the grouping across every metric
+    months, group = np.unique(dates // 100, return_inverse=True)
+    order = np.argsort(group, kind='stable')
+    starts = np.searchsorted(group[order], np.arange(len(months)))
+    first_seen = np.full(len(months), n)
+    np.minimum.at(first_seen, group, np.arange(n))
+    result['months'] = months
+
+    for metric in metrics:
+        raw = np.asarray(columns[metric], dtype=np.float64)
+        present = ~np.isnan(raw)
+        values = np.where(present, raw, 0.0)
+        zero_dates = dates[raw == 0]
+
+        summary = {
+            'mean': raw[present].mean() if present.any() else float('nan'),
+            'total': values.sum(),
+            'max': values.max(),
+            'argmax_date': int(dates[np.argmax(values)]),
+            'first_zero_date': int(zero_dates.min()) if len(zero_dates) else None,
+            'last_zero_date': int(zero_dates.max()) if len(zero_dates) else None,
+        }
+        grouped = values[order]
+        for name, ufunc in MONTHLY_REDUCERS.items():
+            summary[f'monthly_{name}'] = ufunc.reduceat(grouped, starts)
+        summary['highest_month'] = int(months[_first_extreme(summary['monthly_sum'], first_seen, np.max)])
+        summary['lowest_month'] = int(months[_first_extreme(summary['monthly_sum'], first_seen, np.min)])
+        result[metric] = summary
+    return result
+
+
+def format_report(state_code, stats):
+    """
+    Build the per-state statistics report printed by hw5_covid.analyze_state_data.
+
+    :param state_code: Two-letter state code
+    :param stats: One metric's summary from aggregate() (the positiveIncrease one)
+    :return: Report text, ending with a blank line
+    """
+    # The earliest zero-case date is reported, as this analysis always has
+    no_cases_date = stats['first_zero_date']
+    most_recent_no_cases = format_date(no_cases_date) if no_cases_date is not None else "N/A"
+    lines = [
+        "Covid confirmed cases statistics",
+        f"State name: {state_code}",
+        f"Average number of new daily confirmed cases for the entire state dataset: {stats['mean']:.2f}",
+        f"Date with the highest new number of covid cases: {format_date(stats['argmax_date'])}",
+        f"Most recent date with no new covid cases: {most_recent_no_cases}",
+        f"Month with the highest new number of covid cases: {format_month(stats['highest_month'])}",
+        f"Month with the lowest new number of covid cases: {format_month(stats['lowest_month'])}",
+    ]
+    return '\n'.join(lines) + '\n\n'
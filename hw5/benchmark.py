@@ -0,0 +1,326 @@
+# Import necessary libraries
+import argparse  # For command line options
+import gc  # For keeping collections out of the timings
+import itertools  # For region codes
+import json  # For reading data and writing results
+import os  # For file and directory operations
+import platform  # For recording the environment
+import random  # For synthetic data
+import shutil  # For cleaning up generated data
+import tempfile  # For scratch directories
+import time  # For stage timings
+import tracemalloc  # For peak memory
+from collections import defaultdict  # For the legacy monthly totals
+from datetime import datetime, timedelta  # For the legacy date handling and generated dates
+from statistics import mean  # For the legacy average
+
+import numpy as np  # For the record of the NumPy version
+
+from aggregate import aggregate, format_report  # For the current analysis
+from columnar import load_state_columns, records_to_columns  # For the columnar path
+from record_stream import iter_records  # For the streaming path
+
+# Keys of a daily.json record, in the API's order; the generator fills the ones the analysis uses
+RECORD_KEYS = (
+    'date', 'state', 'positive', 'probableCases', 'negative', 'pending', 'totalTestResultsSource',
+    'totalTestResults', 'hospitalizedCurrently', 'hospitalizedCumulative', 'inIcuCurrently',
+    'inIcuCumulative', 'onVentilatorCurrently', 'onVentilatorCumulative', 'recovered',
+    'lastUpdateEt', 'dateModified', 'checkTimeEt', 'death', 'hospitalized', 'hospitalizedDischarged',
+    'dateChecked', 'totalTestsViral', 'positiveTestsViral', 'negativeTestsViral', 'positiveCasesViral',
+    'deathConfirmed', 'deathProbable', 'totalTestEncountersViral', 'totalTestsPeopleViral',
+    'totalTestsAntibody', 'positiveTestsAntibody', 'negativeTestsAntibody', 'totalTestsPeopleAntibody',
+    'positiveTestsPeopleAntibody', 'negativeTestsPeopleAntibody', 'totalTestsPeopleAntigen',
+    'positiveTestsPeopleAntigen', 'totalTestsAntigen', 'positiveTestsAntigen', 'fips',
+    'positiveIncrease', 'negativeIncrease', 'total', 'totalTestResultsIncrease', 'posNeg',
+    'dataQualityGrade', 'deathIncrease', 'hospitalizedIncrease', 'hash', 'commercialScore',
+    'negativeRegularScore', 'negativeScore', 'positiveScore', 'score', 'grade',
+)
+
+PATHS = ('legacy', 'records', 'stream', 'columnar')
+
+
+def region_codes(n_regions):
+    """
+    Make n_regions distinct lowercase region codes (two letters, then three).
+
+    :param n_regions: Number of codes
+    :return: List of codes
+    """
+    codes = []
+    for length in itertools.count(2):
+        for letters in itertools.product('abcdefghijklmnopqrstuvwxyz', repeat=length):
+            codes.append(''.join(letters))
+            if len(codes) == n_regions:
+                return codes
+
+
+def generate_daily(path, region, n_days, rng, start=datetime(2020, 1, 22)):
+    """
+    Write one synthetic daily.json file, newest day first like the API.
+
+    Case counts follow a noisy wave with some zero days, so every
+    statistic has something to find.
+
+    :param path: Output file
+    :param region: Region code stored in each record
+    :param n_days: Number of daily records
+    :param rng: random.Random instance
+    :param start: Date of the oldest record
+    """
+    records = []
+    total = 0
+    scale = rng.uniform(10, 10000)
+    for k in range(n_days):
+        day = start + timedelta(days=k)
+        wave = 1 + np.sin(k / 60.0)
+        increase = 0 if rng.random() < 0.03 else int(scale * wave * rng.uniform(0.5, 1.5))
+        total += increase
+        record = dict.fromkeys(RECORD_KEYS)
+        record.update({
+            'date': int(day.strftime('%Y%m%d')),
+            'state': region.upper(),
+            'positive': total,
+            'positiveIncrease': increase,
+            'death': total // 50,
+            'deathIncrease': increase // 50,
+            'hospitalizedCurrently': increase // 10,
+            'totalTestResultsSource': 'totalTestsViral',
+            'dateChecked': day.strftime('%Y-%m-%dT00:00:00Z'),
+            'hash': '%040x' % rng.getrandbits(160),
+            'fips': '00',
+            'grade': '',
+        })
+        records.append(record)
+    records.reverse()
+    with open(path, 'w') as f:
+        json.dump(records, f)
+
+
+def generate_dataset(directory, n_regions, n_days, seed=0):
+    """
+    Write <region>.json files for n_regions regions with n_days records each.
+
+    :param directory: Output folder
+    :param n_regions: Number of regions
+    :param n_days: Records per region
+    :param seed: Random seed
+    :return: List of region codes
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    codes = region_codes(n_regions)
+    for code in codes:
+        generate_daily(os.path.join(directory, f"{code}.json"), code, n_days, rng)
+    return codes
+
+
+def legacy_analyze(data_dict):
+    """
+    The original list-of-dicts analysis from hw5_covid.py, kept as the benchmark reference.
+
+    :param data_dict: List of daily record dictionaries
+    :return: Summary in the shape format_report expects
+    """
+    positive_increases = [day['positiveIncrease'] for day in data_dict if 'positiveIncrease' in day]
+    avg_daily_cases = mean(positive_increases)
+    highest_day = max(data_dict, key=lambda x: x.get('positiveIncrease', 0))
+    no_new_cases = [day for day in data_dict if day.get('positiveIncrease', 0) == 0]
+    first_zero = min(no_new_cases, key=lambda x: x['date'])['date'] if no_new_cases else None
+    monthly_cases = defaultdict(int)
+    for day in data_dict:
+        month = datetime.strptime(str(day['date']), "%Y%m%d").strftime("%Y-%m")
+        monthly_cases[month] += day.get('positiveIncrease', 0)
+    return {
+        'mean': avg_daily_cases,
+        'argmax_date': highest_day['date'],
+        'first_zero_date': first_zero,
+        'highest_month': int(max(monthly_cases, key=monthly_cases.get).replace('-', '')),
+        'lowest_month': int(min(monthly_cases, key=monthly_cases.get).replace('-', '')),
+    }
+
+
+def run_region(path, json_path, cache_dir, clock):
+    """
+    Run one implementation over one region, timing each stage.
+
+    :param path: One of PATHS
+    :param json_path: Region JSON file
+    :param cache_dir: Column cache folder (already converted for 'columnar')
+    :param clock: Dictionary of stage name to accumulated seconds
+    :return: (number of records, report text)
+    """
+    fields = ('date', 'positiveIncrease')
+    t0 = time.perf_counter()
+    if path == 'columnar':
+        columns = load_state_columns(json_path, cache_dir, fields=fields, mmap=False)
+        t1 = t2 = time.perf_counter()
+    elif path == 'stream':
+        records = iter_records(json_path, fields)
+        t1 = time.perf_counter()  # Reading and parsing are one pass here, so it all counts as parse
+        columns = records_to_columns(records, fields)
+        t2 = time.perf_counter()
+    else:
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+        t1 = time.perf_counter()
+        records = json.loads(raw)
+        t2 = time.perf_counter()
+
+    if path == 'legacy':
+        stats = legacy_analyze(records)
+        n = len(records)
+    else:
+        if path == 'records':
+            columns = records_to_columns(records, fields)
+        stats = aggregate(columns, ('positiveIncrease',))['positiveIncrease']
+        n = len(columns['date'])
+    t3 = time.perf_counter()
+
+    text = format_report(os.path.basename(json_path)[:-len('.json')], stats)
+    t4 = time.perf_counter()
+
+    clock['read'] += t1 - t0
+    clock['parse'] += t2 - t1
+    clock['aggregate'] += t3 - t2
+    clock['report'] += t4 - t3
+    return n, text
+
+
+def run_path(path, directory, codes, cache_dir, repeat=3):
+    """
+    Time one implementation over every region, keeping the best of repeat runs.
+
+    A separate traced run records peak memory so tracing does not skew the timings.
+
+    :param path: One of PATHS
+    :param directory: Folder with the region JSON files
+    :param codes: Region codes
+    :param cache_dir: Column cache folder
+    :param repeat: Number of timed runs
+    :return: Result dictionary
+    """
+    best = None
+    reports = None
+    for _ in range(repeat):
+        clock = defaultdict(float)
+        gc.collect()
+        gc.disable()
+        try:
+            results = [run_region(path, os.path.join(directory, f"{code}.json"), cache_dir, clock) for code in codes]
+        finally:
+            gc.enable()
+        if best is None or sum(clock.values()) < sum(best.values()):
+            best = clock
+        reports = ''.join(text for _, text in results)
+    records = sum(n for n, _ in results)
+
+    tracemalloc.start()
+    for code in codes:
+        run_region(path, os.path.join(directory, f"{code}.json"), cache_dir, defaultdict(float))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(best.values())
+    return {
+        'path': path,
+        'regions': len(codes),
+        'records': records,
+        'stage_seconds': dict(best),
+        'total_seconds': total,
+        'records_per_second': records / total if total else 0.0,
+        'peak_bytes': peak,
+        'reports': reports,
+    }
+
+
+def benchmark(regions=(10, 55), days=(365, 1000), paths=PATHS, repeat=3, seed=0):
+    """
+    Generate datasets for every regions x days size and time every implementation on each.
+
+    The one-off conversion into the column cache is timed separately as
+    convert_seconds, since 'columnar' only pays it when the source changes.
+    Every implementation's report text is checked against the first one.
+
+    :param regions: Region counts to try
+    :param days: Records per region to try
+    :param paths: Implementations to compare (see PATHS)
+    :param repeat: Timed runs per implementation (best is kept)
+    :param seed: Random seed for the generator
+    :return: Results dictionary, ready to be saved as JSON
+    """
+    results = []
+    for n_regions, n_days in itertools.product(regions, days):
+        directory = tempfile.mkdtemp(prefix='hw5_bench_')
+        try:
+            codes = generate_dataset(directory, n_regions, n_days, seed)
+            cache_dir = os.path.join(directory, 'cache')
+            start = time.perf_counter()
+            for code in codes:
+                load_state_columns(os.path.join(directory, f"{code}.json"), cache_dir)
+            convert_seconds = time.perf_counter() - start
+
+            reference = None
+            for path in paths:
+                result = run_path(path, directory, codes, cache_dir, repeat)
+                reports = result.pop('reports')
+                reference = reference if reference is not None else reports
+                result.update({'days': n_days, 'matches_reference': reports == reference})
+                if path == 'columnar':
+                    result['convert_seconds'] = convert_seconds
+                results.append(result)
+                print(f"{path:>9} {n_regions:>4} regions x {n_days:>5} days: "
+                      f"{result['records_per_second']:>10.0f} records/s, "
+                      f"peak {result['peak_bytes'] / 1e6:7.2f} MB"
+                      + ("" if result['matches_reference'] else "  (output differs!)"))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(old, new):
+    """
+    Print the throughput change for every (path, regions, days) found in both result files.
+
+    :param old: Earlier results dictionary
+    :param new: Current results dictionary
+    """
+    def key(result):
+        return result['path'], result['regions'], result['days']
+
+    before = {key(result): result for result in old['results']}
+    for result in new['results']:
+        previous = before.get(key(result))
+        if previous and previous['records_per_second']:
+            change = result['records_per_second'] / previous['records_per_second'] - 1
+            print(f"{result['path']:>9} {result['regions']:>4} x {result['days']:>5}: {change:+.1%} records/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hw5 COVID analysis on synthetic daily.json data")
+    parser.add_argument('--regions', type=int, nargs='+', default=[10, 55], help="Region counts to generate")
+    parser.add_argument('--days', type=int, nargs='+', default=[365, 1000], help="Daily records per region")
+    parser.add_argument('--paths', nargs='+', default=list(PATHS), choices=PATHS, help="Implementations to time")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per implementation (best is kept)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the generator")
+    parser.add_argument('--output', default='hw5_benchmark.json', help="Where to save the results JSON")
+    parser.add_argument('--compare', help="Earlier results JSON to compare throughput against")
+    args = parser.parse_args()
+
+    results = benchmark(args.regions, args.days, args.paths, args.repeat, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), results)
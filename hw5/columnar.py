@@ -0,0 +1,185 @@
+# Import necessary libraries
+import json  # For reading the source JSON and the cache metadata
+import os  # For file and directory operations
+import sys  # For command line arguments
+import time  # For timing loads
+import tracemalloc  # For comparing memory use
+from array import array  # For growing typed columns without Python lists
+
+import numpy as np  # For typed column arrays
+
+from record_stream import iter_records  # For streaming records out of the state files
+
+# Folder holding the per-state JSON files, and the default cache location inside it
+HW5_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HW5_DIR, 'cache')
+
+# Numeric fields kept as columns; date is an int32 YYYYMMDD, the rest are float64 with NaN for null
+NUMERIC_FIELDS = (
+    'date',
+    'positive',
+    'positiveIncrease',
+    'negative',
+    'negativeIncrease',
+    'death',
+    'deathIncrease',
+    'hospitalizedCurrently',
+    'hospitalizedIncrease',
+    'inIcuCurrently',
+    'onVentilatorCurrently',
+    'recovered',
+    'totalTestResults',
+    'totalTestResultsIncrease',
+)
+
+
+def source_stamp(json_path):
+    """
+    Identify the current version of a source JSON file.
+
+    :param json_path: Path to a state JSON file
+    :return: Dictionary with the file's size and modification time in nanoseconds
+    """
+    stat = os.stat(json_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def state_cache_dir(json_path, cache_dir=CACHE_DIR):
+    """
+    Return the cache folder for a state file, e.g. cache/ca for ca.json.
+
+    :param json_path: Path to a state JSON file
+    :param cache_dir: Root of the column cache
+    :return: Path to the state's cache folder
+    """
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(json_path))[0])
+
+
+def is_fresh(json_path, cache_dir=CACHE_DIR, fields=NUMERIC_FIELDS):
+    """
+    Check whether a state's cached columns still match its source JSON.
+
+    :param json_path: Path to a state JSON file
+    :param cache_dir: Root of the column cache
+    :param fields: Fields that must be present in the cache
+    :return: True if the cache can be used as is
+    """
+    meta_path = os.path.join(state_cache_dir(json_path, cache_dir), 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    return meta.get('source') == source_stamp(json_path) and set(fields) <= set(meta.get('fields', []))
+
+
+def records_to_columns(records, fields=NUMERIC_FIELDS):
+    """
+    Turn daily record dictionaries into typed column arrays in one pass.
+
+    :param records: Iterable of daily record dictionaries (a list or a stream)
+    :param fields: Numeric fields to keep
+    :return: Dictionary of field name to NumPy array, in record order
+    """
+    buffers = {field: array('i' if field == 'date' else 'd') for field in fields}
+    others = [field for field in fields if field != 'date']
+    for day in records:
+        if 'date' in buffers:
+            buffers['date'].append(day['date'])
+        for field in others:
+            value = day.get(field)
+            buffers[field].append(np.nan if value is None else value)
+    return {
+        field: np.array(buffer, dtype=np.int32 if field == 'date' else np.float64)
+        for field, buffer in buffers.items()
+    }
+
+
+def convert_state(json_path, cache_dir=CACHE_DIR, fields=NUMERIC_FIELDS):
+    """
+    Convert one state JSON file into .npy columns and record the source it came from.
+
+    The metadata file is written last, so an interrupted conversion is
+    simply treated as stale the next time.
+
+    :param json_path: Path to a state JSON file
+    :param cache_dir: Root of the column cache
+    :param fields: Numeric fields to keep
+    :return: Dictionary of field name to NumPy array
+    """
+    stamp = source_stamp(json_path)
+    columns = records_to_columns(iter_records(json_path, fields), fields)  # Keeps only the wanted fields
+
+    # Save each column as its own .npy file so it can be memory-mapped alone
+    target = state_cache_dir(json_path, cache_dir)
+    os.makedirs(target, exist_ok=True)
+    for field, column in columns.items():
+        np.save(os.path.join(target, f"{field}.npy"), column)
+    with open(os.path.join(target, 'meta.json'), 'w') as f:
+        json.dump({'source': stamp, 'fields': list(fields), 'rows': len(columns['date'])}, f)
+    return columns
+
+
+def load_state_columns(json_path, cache_dir=CACHE_DIR, fields=NUMERIC_FIELDS, mmap=True):
+    """
+    Load a state's numeric columns, rebuilding the cache first if the JSON changed.
+
+    :param json_path: Path to a state JSON file
+    :param cache_dir: Root of the column cache
+    :param fields: Numeric fields to load
+    :param mmap: Memory-map the columns instead of reading them into memory
+    :return: Dictionary of field name to NumPy array, in the JSON's record order
+    """
+    if not is_fresh(json_path, cache_dir, fields):
+        columns = convert_state(json_path, cache_dir, fields)
+        return {field: columns[field] for field in fields}
+    target = state_cache_dir(json_path, cache_dir)
+    return {
+        field: np.load(os.path.join(target, f"{field}.npy"), mmap_mode='r' if mmap else None)
+        for field in fields
+    }
+
+
+def convert_all(data_dir=HW5_DIR, cache_dir=CACHE_DIR, fields=NUMERIC_FIELDS):
+    """
+    Convert every stale <state>.json file in a folder.
+
+    :param data_dir: Folder with <state>.json files
+    :param cache_dir: Root of the column cache
+    :param fields: Numeric fields to keep
+    :return: List of state codes that were (re)converted
+    """
+    converted = []
+    for name in sorted(os.listdir(data_dir)):
+        json_path = os.path.join(data_dir, name)
+        is_state_file = name.endswith('.json') and len(name) == len('xx.json')  # Two-letter state codes only
+        if is_state_file and not is_fresh(json_path, cache_dir, fields):
+            convert_state(json_path, cache_dir, fields)
+            converted.append(name[:-len('.json')])
+    return converted
+
+
+if __name__ == "__main__":
+    # Convert everything, then compare load time and size against the dict representation
+    converted = convert_all()
+    print(f"Converted {len(converted)} state file(s)")
+
+    states = [arg.lower() for arg in sys.argv[1:]] or ['ca']
+    for state in states:
+        json_path = os.path.join(HW5_DIR, f"{state}.json")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(json_path, 'r') as f:
+            records = json.load(f)
+        json_seconds = time.perf_counter() - start
+        json_bytes = tracemalloc.get_traced_memory()[0]
+        del records
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        columns = load_state_columns(json_path, mmap=False)
+        column_seconds = time.perf_counter() - start
+        column_bytes = sum(column.nbytes for column in columns.values())
+
+        print(f"{state}: {len(columns['date'])} days, JSON load {json_seconds * 1000:.1f} ms / {json_bytes / 1024:.0f} KB, "
+              f"column load {column_seconds * 1000:.2f} ms / {column_bytes / 1024:.0f} KB")
@@ -0,0 +1,265 @@
+# Import necessary libraries
+import argparse  # For the command line interface
+import os  # For file and directory operations
+
+import numpy as np  # For sorted indexes and prefix sums
+
+from aggregate import format_date, format_month  # For printing dates
+from columnar import CACHE_DIR, HW5_DIR, load_state_columns  # For typed column arrays
+
+
+def day_numbers(yyyymmdd):
+    """
+    Convert YYYYMMDD integers to consecutive day numbers with integer arithmetic only.
+
+    Uses the days-from-civil formula for the proleptic Gregorian calendar,
+    so day_numbers(d) - day_numbers(e) is the number of days between e and d.
+
+    :param yyyymmdd: Integer or array of YYYYMMDD dates
+    :return: Day numbers (days since 1970-01-01)
+    """
+    d = np.asarray(yyyymmdd, dtype=np.int64)
+    year, month, day = d // 10000, d // 100 % 100, d % 100
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_date(text):
+    """
+    Read a date given as YYYY-MM-DD or YYYYMMDD.
+
+    :param text: Date string
+    :return: YYYYMMDD integer
+    """
+    return int(text.replace('-', ''))
+
+
+def parse_month(text):
+    """
+    Read a month given as YYYY-MM or YYYYMM.
+
+    :param text: Month string
+    :return: YYYYMM integer
+    """
+    return int(text.replace('-', ''))
+
+
+class StateIndex:
+    """
+    Precomputed indexes over one region's daily series.
+
+    Building the index sorts the days once and stores prefix sums over the
+    days and over the months, the days ranked by value, and the zero-value
+    dates. After that, a range sum or a rolling average is two binary
+    searches, top-K is a slice, and the last zero date is a lookup.
+    """
+
+    def __init__(self, dates, values):
+        """
+        :param dates: YYYYMMDD integers, in any order (duplicates are added together)
+        :param values: Daily values; NaN counts as 0
+        """
+        dates = np.asarray(dates, dtype=np.int64)
+        values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        self.dates, index = np.unique(dates, return_inverse=True)
+        self.values = np.bincount(index, weights=values, minlength=len(self.dates))
+        self.days = day_numbers(self.dates)
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+
+        # Monthly totals with their own prefix sums, for month-range questions
+        self.months, month_index = np.unique(self.dates // 100, return_inverse=True)
+        self.monthly = np.bincount(month_index, weights=self.values, minlength=len(self.months))
+        self.monthly_prefix = np.concatenate(([0.0], np.cumsum(self.monthly)))
+
+        # Highest values first; ties go to the later date
+        self.ranked = np.lexsort((-self.dates, -self.values))
+        self.zero_dates = self.dates[self.values == 0]
+
+    @classmethod
+    def from_columns(cls, columns, metric='positiveIncrease'):
+        """
+        Build an index from columnar.load_state_columns output.
+
+        :param columns: Dictionary of column arrays with 'date' and the metric
+        :param metric: Metric column to index
+        :return: StateIndex
+        """
+        return cls(columns['date'], columns[metric])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def range_sum(self, start=None, end=None):
+        """
+        Total over start <= date <= end (either bound may be None).
+
+        :param start: First YYYYMMDD date included
+        :param end: Last YYYYMMDD date included
+        :return: Sum of the daily values in the range
+        """
+        i = 0 if start is None else np.searchsorted(self.dates, start, side='left')
+        j = len(self.dates) if end is None else np.searchsorted(self.dates, end, side='right')
+        return float(self.prefix[j] - self.prefix[min(i, j)])
+
+    def rolling_average(self, end, n=7):
+        """
+        Average daily value over the n calendar days ending on end (missing days count as 0).
+
+        :param end: Last YYYYMMDD date of the window
+        :param n: Window length in days
+        :return: Average per day
+        """
+        last = int(day_numbers(end))
+        i = np.searchsorted(self.days, last - n + 1, side='left')
+        j = np.searchsorted(self.days, last, side='right')
+        return float(self.prefix[j] - self.prefix[i]) / n
+
+    def rolling_series(self, n=7):
+        """
+        Rolling n-day averages for every recorded date, from the same prefix sums.
+
+        :param n: Window length in days
+        :return: (dates, averages)
+        """
+        starts = np.searchsorted(self.days, self.days - n + 1, side='left')
+        return self.dates, (self.prefix[np.arange(1, len(self.dates) + 1)] - self.prefix[starts]) / n
+
+    def top_days(self, k=10):
+        """
+        The k days with the highest values.
+
+        :param k: Number of days
+        :return: List of (YYYYMMDD, value), highest first
+        """
+        return [(int(self.dates[i]), float(self.values[i])) for i in self.ranked[:k]]
+
+    def last_zero_date(self, before=None):
+        """
+        Most recent date with a value of 0, optionally on or before a given date.
+
+        :param before: Latest YYYYMMDD date to consider (None means any)
+        :return: YYYYMMDD integer, or None if there is no such date
+        """
+        j = len(self.zero_dates) if before is None else np.searchsorted(self.zero_dates, before, side='right')
+        return int(self.zero_dates[j - 1]) if j else None
+
+    def month_total(self, month):
+        """
+        Total for one month.
+
+        :param month: YYYYMM integer
+        :return: Monthly total (0 if the month has no data)
+        """
+        i = np.searchsorted(self.months, month)
+        return float(self.monthly[i]) if i < len(self.months) and self.months[i] == month else 0.0
+
+    def month_range_sum(self, start, end):
+        """
+        Total over the months start..end inclusive.
+
+        :param start: First YYYYMM month included
+        :param end: Last YYYYMM month included
+        :return: Sum of the monthly totals
+        """
+        i = np.searchsorted(self.months, start, side='left')
+        j = np.searchsorted(self.months, end, side='right')
+        return float(self.monthly_prefix[j] - self.monthly_prefix[min(i, j)])
+
+
+class CovidQuery:
+    """
+    Query layer over every state's data, with one lazily built StateIndex per state.
+
+    The code 'us' is the national series: all states' daily values added up by date.
+    """
+
+    def __init__(self, state_codes, data_dir=HW5_DIR, cache_dir=CACHE_DIR, metric='positiveIncrease'):
+        self.state_codes = [code.lower() for code in state_codes]
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self.metric = metric
+        self.indexes = {}
+
+    def state(self, code):
+        """
+        Return the index for a state (or 'us'), building it on first use.
+
+        :param code: Two-letter state code or 'us'
+        :return: StateIndex
+        """
+        code = code.lower()
+        if code not in self.indexes:
+            if code == 'us':
+                parts = [self.state(state) for state in self.state_codes]
+                self.indexes[code] = StateIndex(
+                    np.concatenate([part.dates for part in parts]),
+                    np.concatenate([part.values for part in parts])
+                )
+            else:
+                json_path = os.path.join(self.data_dir, f"{code}.json")
+                if not os.path.exists(json_path):
+                    raise KeyError(f"No data file for {code}")
+                columns = load_state_columns(json_path, self.cache_dir, fields=('date', self.metric))
+                self.indexes[code] = StateIndex.from_columns(columns, self.metric)
+        return self.indexes[code]
+
+
+def main(argv=None):
+    """
+    Command line entry point, e.g. python hw5/covid_query.py top ca 5.
+
+    :param argv: Argument list (defaults to sys.argv)
+    """
+    from hw5_covid import state_codes  # The state list lives with the main script
+
+    parser = argparse.ArgumentParser(description="Query per-state COVID-19 data ('us' is the national total)")
+    parser.add_argument('--metric', default='positiveIncrease', help="Column to query")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sum_parser = commands.add_parser('sum', help="Total between two dates (inclusive)")
+    sum_parser.add_argument('state')
+    sum_parser.add_argument('start', type=parse_date)
+    sum_parser.add_argument('end', type=parse_date)
+
+    rolling_parser = commands.add_parser('rolling', help="Average over the N days ending on a date")
+    rolling_parser.add_argument('state')
+    rolling_parser.add_argument('date', type=parse_date)
+    rolling_parser.add_argument('days', type=int, nargs='?', default=7)
+
+    top_parser = commands.add_parser('top', help="Days with the highest values")
+    top_parser.add_argument('state')
+    top_parser.add_argument('k', type=int, nargs='?', default=10)
+
+    zero_parser = commands.add_parser('last-zero', help="Most recent date with a value of 0")
+    zero_parser.add_argument('state')
+    zero_parser.add_argument('--before', type=parse_date, help="Only consider dates up to this one")
+
+    month_parser = commands.add_parser('month', help="Total for a month or a range of months")
+    month_parser.add_argument('state')
+    month_parser.add_argument('start', type=parse_month)
+    month_parser.add_argument('end', type=parse_month, nargs='?')
+
+    args = parser.parse_args(argv)
+    index = CovidQuery(state_codes, metric=args.metric).state(args.state)
+
+    if args.command == 'sum':
+        print(f"{args.metric} from {format_date(args.start)} to {format_date(args.end)}: {index.range_sum(args.start, args.end):.0f}")
+    elif args.command == 'rolling':
+        print(f"{args.days}-day average of {args.metric} ending {format_date(args.date)}: {index.rolling_average(args.date, args.days):.2f}")
+    elif args.command == 'top':
+        for date, value in index.top_days(args.k):
+            print(f"{format_date(date)}: {value:.0f}")
+    elif args.command == 'last-zero':
+        date = index.last_zero_date(args.before)
+        print(format_date(date) if date is not None else "N/A")
+    elif args.command == 'month':
+        end = args.end or args.start
+        print(f"{args.metric} from {format_month(args.start)} to {format_month(end)}: {index.month_range_sum(args.start, end):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,14 @@
 import requests  # For making HTTP requests
 import json  # For handling JSON data
 import os  # For file and directory operations
-from statistics import mean  # For calculating averages
-from datetime import datetime  # For date manipulations
-from collections import defaultdict  # For counting cases per month
+import argparse  # For command line options
+from state_fetch import BASE_URL, fetch_states  # For concurrent, cache-aware downloads
+from columnar import records_to_columns  # For typed column arrays
+from aggregate import aggregate, format_report  # For the one-pass statistics
+from national import analyze_states, report  # For the process-pool analysis and national view
+
+# Folder holding this script, the state list and the per-state JSON files
+HW5_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def read_state_codes(filename):
     """
@@ -17,7 +22,7 @@ def read_state_codes(filename):
         return [line.strip() for line in file]
 
 # Read state codes from the file
-state_codes = read_state_codes('hw5\state_territories.txt')
+state_codes = read_state_codes(os.path.join(HW5_DIR, 'state_territories.txt'))
 
 def fetch_and_save_state_data(state_code):
     """
@@ -33,8 +38,7 @@ def fetch_and_save_state_data(state_code):
         data = response.json()
         
         # Save JSON data to a file in the hw5 folder
-        hw5 = 'hw5'  # Define the hw5 variable with the correct path
-        file_path = os.path.join(hw5, f"{state_code.lower()}.json")
+        file_path = os.path.join(HW5_DIR, f"{state_code.lower()}.json")
         with open(file_path, "w") as f:
             json.dump(data, f)
         
@@ -48,53 +52,59 @@ def analyze_state_data(state_code, data_dict):
     Analyze COVID-19 data for a given state and print statistics.
     
     :param state_code: Two-letter state code
-    :param data_dict: Dictionary containing the state's COVID-19 data
+    :param data_dict: Iterable of the state's daily records (a list or a stream), or a
+        dictionary of column arrays as returned by columnar.load_state_columns
     """
-    if not data_dict:
+    if data_dict is None:
         return
     
-    # Extract positive increases (new cases) for each day
-    positive_increases = [day['positiveIncrease'] for day in data_dict if 'positiveIncrease' in day]
-    
-    # Calculate average daily cases
-    avg_daily_cases = mean(positive_increases)
-    
-    # Find the day with the highest number of new cases
-    highest_day = max(data_dict, key=lambda x: x.get('positiveIncrease', 0))
-    highest_date = datetime.strptime(str(highest_day['date']), "%Y%m%d").strftime("%Y-%m-%d")
-    
-    # Find the most recent date with no new cases
-    no_new_cases = [day for day in data_dict if day.get('positiveIncrease', 0) == 0]
-    most_recent_no_cases = min(no_new_cases, key=lambda x: x['date'])['date'] if no_new_cases else "N/A"
-    most_recent_no_cases = datetime.strptime(str(most_recent_no_cases), "%Y%m%d").strftime("%Y-%m-%d") if most_recent_no_cases != "N/A" else "N/A"
-    
-    # Calculate total cases for each month
-    monthly_cases = defaultdict(int)
-    for day in data_dict:
-        month = datetime.strptime(str(day['date']), "%Y%m%d").strftime("%Y-%m")
-        monthly_cases[month] += day.get('positiveIncrease', 0)
-    
-    # Find months with highest and lowest new cases
-    highest_month = max(monthly_cases, key=monthly_cases.get)
-    lowest_month = min(monthly_cases, key=monthly_cases.get)
+    # Pull out just the columns we need and summarize them in one vectorized pass
+    columns = data_dict if isinstance(data_dict, dict) else records_to_columns(data_dict, ('date', 'positiveIncrease'))
+    if len(columns['date']) == 0:
+        return
+    stats = aggregate(columns, ('positiveIncrease',))['positiveIncrease']
     
-    # Print the analysis results
-    print("Covid confirmed cases statistics")
-    print(f"State name: {state_code}")
-    print(f"Average number of new daily confirmed cases for the entire state dataset: {avg_daily_cases:.2f}")
-    print(f"Date with the highest new number of covid cases: {highest_date}")
-    print(f"Most recent date with no new covid cases: {most_recent_no_cases}")
-    print(f"Month with the highest new number of covid cases: {highest_month}")
-    print(f"Month with the lowest new number of covid cases: {lowest_month}")
-    print()  # Add a blank line between states
+    # Print the analysis results (with a blank line between states)
+    print(format_report(state_code, stats), end='')
 
-def main():
+def main(base_url=BASE_URL, max_workers=8, max_age=86400, national=False, processes=None):
     """
     Main function to process data for all states.
+    
+    States are downloaded concurrently and each one is analyzed as soon as
+    its data arrives; local files that are still fresh are not downloaded again.
+    With national=True the analysis instead runs on a process pool after the
+    downloads, and the per-state reports (in state list order) are followed by
+    national totals and rankings.
+    
+    :param base_url: URL prefix for <state>/daily.json (point it at a stub server to test)
+    :param max_workers: Maximum number of downloads in flight
+    :param max_age: Seconds a local file counts as fresh without asking the server
+    :param national: Analyze on a process pool and add the combined national view
+    :param processes: Number of analysis processes for national=True (None uses every core)
     """
-    for state in state_codes:
-        data = fetch_and_save_state_data(state)
-        analyze_state_data(state, data)
+    # Only the fields the analysis reads are ever built into Python objects; the national
+    # workers read the column cache themselves, so there the files only need to be on disk
+    fields = ('date', 'positiveIncrease')
+    for state, data, status in fetch_states(state_codes, HW5_DIR, base_url, max_workers, max_age, fields=fields,
+                                            load=not national):
+        if status == 'failed':
+            print(f"Failed to fetch data for {state}")
+        elif status == 'stale':
+            print(f"Failed to refresh data for {state}, using the local copy")
+        if not national:
+            analyze_state_data(state, data)
+    
+    if national:
+        print(report(analyze_states(state_codes, HW5_DIR, max_workers=processes)), end='')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="COVID-19 statistics per state")
+    parser.add_argument('--base-url', default=BASE_URL, help="URL prefix for <state>/daily.json")
+    parser.add_argument('--workers', type=int, default=8, help="Maximum number of downloads in flight")
+    parser.add_argument('--max-age', type=float, default=86400, help="Seconds a local file is used without revalidating")
+    parser.add_argument('--national', action='store_true', help="Analyze states on a process pool and add national totals and rankings")
+    parser.add_argument('--processes', type=int, help="Number of analysis processes for --national")
+    args = parser.parse_args()
+    main(base_url=args.base_url, max_workers=args.workers, max_age=args.max_age,
+         national=args.national, processes=args.processes)
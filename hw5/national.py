@@ -0,0 +1,156 @@
+# Import necessary libraries
+import os  # For file and directory operations
+from concurrent.futures import ProcessPoolExecutor  # For spreading states across cores
+
+import numpy as np  # For merging daily and monthly series
+
+from aggregate import aggregate, format_date, format_month, format_report  # For per-state statistics
+from columnar import CACHE_DIR, HW5_DIR, load_state_columns  # For typed column arrays
+
+# Columns every partial needs
+METRIC = 'positiveIncrease'
+
+
+def state_partial(state_code, data_dir=HW5_DIR, cache_dir=CACHE_DIR, metric=METRIC):
+    """
+    Analyze one state in a worker and return a compact partial aggregate instead of printing.
+
+    The partial holds the state's summary plus its daily and monthly series
+    as small NumPy arrays, which is all merge_partials needs.
+
+    :param state_code: Two-letter state code
+    :param data_dir: Folder with the <state>.json files
+    :param cache_dir: Root of the column cache
+    :param metric: Metric column to aggregate
+    :return: Partial aggregate dictionary, or None if the state has no data file
+    """
+    json_path = os.path.join(data_dir, f"{state_code.lower()}.json")
+    if not os.path.exists(json_path):
+        return None
+    columns = load_state_columns(json_path, cache_dir, fields=('date', metric), mmap=False)
+    if len(columns['date']) == 0:
+        return None
+    result = aggregate(columns, (metric,))
+    stats = result[metric]
+    values = np.nan_to_num(columns[metric])
+    return {
+        'state': state_code,
+        'days': result['days'],
+        'stats': {key: value for key, value in stats.items() if not key.startswith('monthly_')},
+        'dates': columns['date'],
+        'daily': values,
+        'months': result['months'],
+        'monthly': stats['monthly_sum'],
+    }
+
+
+def analyze_states(state_codes, data_dir=HW5_DIR, cache_dir=CACHE_DIR, max_workers=None, metric=METRIC):
+    """
+    Run state_partial for every state on a process pool.
+
+    :param state_codes: Two-letter state codes
+    :param data_dir: Folder with the <state>.json files
+    :param cache_dir: Root of the column cache
+    :param max_workers: Number of worker processes (None uses every core)
+    :param metric: Metric column to aggregate
+    :return: Partials in the same order as state_codes (None for states without data)
+    """
+    state_codes = list(state_codes)
+    if max_workers == 1:
+        return [state_partial(state, data_dir, cache_dir, metric) for state in state_codes]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        chunksize = max(1, len(state_codes) // ((max_workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(
+            state_partial, state_codes,
+            [data_dir] * len(state_codes), [cache_dir] * len(state_codes), [metric] * len(state_codes),
+            chunksize=chunksize
+        ))
+
+
+def _sum_by_key(keys, values):
+    """
+    Total values per distinct key.
+
+    :param keys: Integer keys (dates or months)
+    :param values: Values to add up per key
+    :return: (sorted distinct keys, totals)
+    """
+    unique, index = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(index, weights=values, minlength=len(unique))
+
+
+def merge_partials(partials):
+    """
+    Merge per-state partials into national daily and monthly totals and state rankings.
+
+    Every output is sorted, with ties broken by state code, so the result
+    does not depend on how the work was split across processes.
+
+    :param partials: Partial aggregates from state_partial (None entries are skipped)
+    :return: Dictionary with 'states', 'daily', 'monthly' and 'rankings'
+    """
+    partials = sorted((p for p in partials if p is not None), key=lambda p: p['state'])
+    if not partials:
+        return {'states': 0, 'daily': (np.zeros(0, dtype=np.int64), np.zeros(0)),
+                'monthly': (np.zeros(0, dtype=np.int64), np.zeros(0)), 'rankings': {}}
+
+    daily = _sum_by_key(
+        np.concatenate([p['dates'] for p in partials]).astype(np.int64),
+        np.concatenate([p['daily'] for p in partials])
+    )
+    monthly = _sum_by_key(
+        np.concatenate([p['months'] for p in partials]).astype(np.int64),
+        np.concatenate([p['monthly'] for p in partials])
+    )
+
+    def ranking(key):
+        return [(p['state'], p['stats'][key]) for p in sorted(partials, key=lambda p: (-p['stats'][key], p['state']))]
+
+    return {
+        'states': len(partials),
+        'daily': daily,
+        'monthly': monthly,
+        'rankings': {
+            'total': ranking('total'),
+            'mean': ranking('mean'),
+            'peak_day': ranking('max'),
+        },
+    }
+
+
+def format_national(national, top=5):
+    """
+    Build a short text summary of the national totals.
+
+    :param national: Output of merge_partials
+    :param top: Number of states to list per ranking
+    :return: Summary text
+    """
+    if not national['states']:
+        return "No state data to combine\n"
+    dates, daily = national['daily']
+    months, monthly = national['monthly']
+    peak = int(np.argmax(daily))
+    lines = [
+        "National covid confirmed cases statistics",
+        f"States combined: {national['states']}",
+        f"Total new confirmed cases: {daily.sum():.0f}",
+        f"Date with the highest new number of covid cases: {format_date(dates[peak])} ({daily[peak]:.0f})",
+        f"Month with the highest new number of covid cases: {format_month(months[np.argmax(monthly)])}",
+        f"Month with the lowest new number of covid cases: {format_month(months[np.argmin(monthly)])}",
+    ]
+    for name, label in (('total', 'total cases'), ('mean', 'average daily cases'), ('peak_day', 'single-day peak')):
+        ranked = ', '.join(f"{state} ({value:.0f})" for state, value in national['rankings'][name][:top])
+        lines.append(f"Top states by {label}: {ranked}")
+    return '\n'.join(lines) + '\n'
+
+
+def report(partials):
+    """
+    Build the per-state reports, in input order, followed by the national summary.
+
+    :param partials: Partial aggregates from analyze_states
+    :return: Report text
+    """
+    text = ''.join(format_report(p['state'], p['stats']) for p in partials if p is not None)
+    return text + format_national(merge_partials(partials))
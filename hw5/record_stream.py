@@ -0,0 +1,128 @@
+# Import necessary libraries
+import codecs  # For decoding UTF-8 byte chunks incrementally
+import json  # For decoding one record at a time
+import re  # For scanning record boundaries
+from sys import intern  # For sharing repeated key strings
+
+# Strings (with escapes) and the structural characters that change nesting depth; an
+# unterminated string at the end of the buffer is swallowed whole so its contents never
+# look like structure
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"?|[{}\[\]]', re.DOTALL)
+_SKIP = re.compile(r'[\s,]*')
+
+_decoder = json.JSONDecoder()
+
+
+def _chunks(source, chunk_size):
+    """
+    Turn a path, an open file or an iterable of chunks into a stream of text chunks.
+
+    :param source: File path, binary or text file object, or iterable of bytes/str chunks
+    :param chunk_size: Bytes to read at a time from files
+    :return: Generator of str chunks
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            yield from _chunks(f, chunk_size)
+        return
+    if hasattr(source, 'read'):
+        read = source.read
+        source = iter(lambda: read(chunk_size), read(0))
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in source:
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _object_end(text, start):
+    """
+    Find where the JSON object starting at text[start] ends.
+
+    :param text: Buffered text
+    :param start: Index of the object's opening brace
+    :return: Index just past the closing brace, or -1 if the object is not complete yet
+    """
+    depth = 0
+    for token in _TOKEN.finditer(text, start):
+        char = token.group()
+        if char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    return -1
+
+
+def iter_records(source, fields=None, chunk_size=1 << 16):
+    """
+    Yield the records of a top-level JSON array one at a time.
+
+    Only one chunk plus the record being decoded is held in memory, so a
+    file of any size can be read with bounded memory. Each record is decoded
+    with the C JSON scanner, and with fields it is cut down to those keys
+    before the next one is read, so only the kept values outlive their record.
+
+    :param source: Path to a <state>.json file, an open file, or an iterable
+        of byte/str chunks such as requests' response.iter_content()
+    :param fields: Keys to keep in each record (None keeps the whole record)
+    :param chunk_size: Bytes to read at a time from files
+    :return: Generator of record dictionaries, in array order
+    """
+    buffer = ''
+    position = 0
+    opened = False
+    for chunk in _chunks(source, chunk_size):
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            position = _SKIP.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+            char = buffer[position]
+            if not opened:
+                if char != '[':
+                    raise ValueError("Expected a JSON array of records")
+                opened = True
+                position += 1
+                continue
+            if char == ']':
+                return
+            if char != '{':
+                raise ValueError(f"Expected a JSON object at offset {position} of the buffered text")
+            try:
+                record, end = _decoder.raw_decode(buffer, position)
+            except ValueError:
+                if _object_end(buffer, position) >= 0:
+                    raise  # The record is complete, so it is malformed
+                break  # Record continues in the next chunk
+            if fields is None:
+                # Share key strings across records the way a single json.load does
+                record = {intern(key): value for key, value in record.items()}
+            else:
+                record = {field: record[field] for field in fields if field in record}
+            yield record
+            position = end
+    raise ValueError("Truncated JSON array")
+
+
+def iter_url_records(url, session=None, fields=None, chunk_size=1 << 16, timeout=30):
+    """
+    Stream the records of a JSON array served over HTTP without holding the whole body.
+
+    :param url: URL returning a JSON array, e.g. .../states/ca/daily.json
+    :param session: requests.Session to use (a plain request if None)
+    :param fields: Keys to keep in each record (None keeps the whole record)
+    :param chunk_size: Bytes per network read
+    :param timeout: Request timeout in seconds
+    :return: Generator of record dictionaries
+    """
+    import requests  # Only needed when streaming from the network
+
+    response = (session or requests).get(url, stream=True, timeout=timeout)
+    response.raise_for_status()
+    with response:
+        yield from iter_records(response.iter_content(chunk_size), fields, chunk_size)
+
@@ -0,0 +1,182 @@
+# Import necessary libraries
+import os  # For file and directory operations
+import threading  # For serving the stub from a background thread
+import time  # For file ages
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait  # For concurrent downloads
+from itertools import islice  # For filling the submission window
+from email.utils import formatdate, parsedate_to_datetime  # For HTTP date headers
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # For the local stub server
+
+import requests  # For making HTTP requests
+from requests.adapters import HTTPAdapter  # For connection pooling
+
+from record_stream import iter_records  # For streaming records out of the state files
+
+# Folder holding the per-state JSON files and the real API endpoint
+HW5_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_URL = 'https://api.covidtracking.com/v1/states'
+
+
+def make_session(pool_size=8):
+    """
+    Create a session that keeps connections open across state downloads.
+
+    :param pool_size: Number of pooled connections (match the worker count)
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_state(session, state_code, data_dir=HW5_DIR, base_url=BASE_URL, max_age=86400, timeout=30, fields=None, load=True):
+    """
+    Fetch one state's daily data, reusing the local copy whenever it is still valid.
+
+    A local file younger than max_age seconds is used without any request.
+    An older one is revalidated with If-Modified-Since, and a 304 reuses it.
+    Only a 200 response is written back to disk; if the request fails, an
+    existing local copy is used as is. Nothing is printed here, since this
+    runs on worker threads; callers report the status. Downloads are
+    streamed straight to disk. The data is a generator that streams the
+    file's records keeping only the given fields, so nothing is parsed
+    until the caller consumes it. With load=False no generator is made, for
+    callers that only need the file on disk.
+
+    :param session: Pooled requests.Session
+    :param state_code: Two-letter state code
+    :param data_dir: Folder with the <state>.json files
+    :param base_url: URL prefix for <state>/daily.json
+    :param max_age: Seconds a local file counts as fresh without asking the server
+    :param timeout: Per-request timeout in seconds
+    :param fields: Keys to keep in each record (None keeps whole records)
+    :param load: Return a record stream (False returns None as the data)
+    :return: (state_code, record generator or None, status) with status 'fresh', 'not-modified', 'downloaded', 'stale' or 'failed'
+    """
+    file_path = os.path.join(data_dir, f"{state_code.lower()}.json")
+
+    def local(status):
+        return state_code, iter_records(file_path, fields) if load else None, status
+
+    headers = {}
+    have_local = os.path.exists(file_path)
+    if have_local:
+        modified = os.path.getmtime(file_path)
+        if time.time() - modified < max_age:
+            return local('fresh')
+        headers['If-Modified-Since'] = formatdate(modified, usegmt=True)
+
+    url = f"{base_url}/{state_code.lower()}/daily.json"
+    try:
+        response = session.get(url, headers=headers, timeout=timeout, stream=True)
+        status_code = response.status_code
+        if status_code == 200:
+            # Write to a temporary file first so a broken download never replaces good data
+            with open(file_path + '.part', 'wb') as f:
+                for chunk in response.iter_content(1 << 16):
+                    f.write(chunk)
+            os.replace(file_path + '.part', file_path)
+        response.close()
+    except requests.RequestException:
+        status_code = None
+
+    if status_code == 304:
+        os.utime(file_path)  # Revalidated, so restart the freshness window
+        return local('not-modified')
+    if status_code != 200:
+        return local('stale') if have_local else (state_code, None, 'failed')
+
+    return local('downloaded')
+
+
+def fetch_states(state_codes, data_dir=HW5_DIR, base_url=BASE_URL, max_workers=8, max_age=86400, session=None, fields=None,
+                 load=True):
+    """
+    Fetch many states concurrently and yield each one as soon as it is ready.
+
+    At most max_workers states are submitted at a time, and each finished one
+    is dropped once yielded, so only that many results are ever held.
+
+    :param state_codes: Two-letter state codes
+    :param data_dir: Folder with the <state>.json files
+    :param base_url: URL prefix for <state>/daily.json
+    :param max_workers: Maximum number of downloads in flight
+    :param max_age: Seconds a local file counts as fresh without asking the server
+    :param session: Pooled session to reuse (created if None)
+    :param fields: Keys to keep in each record (None keeps whole records)
+    :param load: Read the records back (False only makes sure the files are on disk)
+    :return: Generator of (state_code, record generator or None, status) in completion order
+    """
+    session = session or make_session(max_workers)
+    states = iter(state_codes)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def submit(state):
+            return pool.submit(fetch_state, session, state, data_dir, base_url, max_age, fields=fields, load=load)
+
+        pending = {submit(state) for state in islice(states, max_workers)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            pending |= {submit(state) for state in islice(states, len(done))}  # Refill before handing results out
+            while done:
+                yield done.pop().result()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Serve <data_dir>/<state>.json at /<state>/daily.json with Last-Modified support."""
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        file_path = os.path.join(self.server.data_dir, f"{parts[-2]}.json") if len(parts) >= 2 else ''
+        if not os.path.exists(file_path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.server.requests += 1
+        modified = int(os.path.getmtime(file_path))
+        since = self.headers.get('If-Modified-Since')
+        if since and parsedate_to_datetime(since).timestamp() >= modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        time.sleep(self.server.latency)  # Simulated network round trip
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', formatdate(modified, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output quiet
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the COVID Tracking API that serves files from a folder.
+
+    Use server.url as base_url for fetch_states. requests counts every
+    request that reached the stub, so tests can check which ones were skipped.
+    """
+
+    def __init__(self, data_dir, latency=0.0, port=0):
+        super().__init__(('127.0.0.1', port), _StubHandler)
+        self.data_dir = data_dir
+        self.latency = latency
+        self.requests = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1/states'
+
+    def start(self):
+        """
+        Serve requests from a daemon thread.
+
+        :return: The server itself
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
@@ -0,0 +1,6 @@
+# Import necessary libraries
+import os  # For file and directory operations
+import sys  # For the module search path
+
+# The hw5 modules import each other by bare name, as when run from that folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,38 @@
+# Import necessary libraries
+import json  # For writing test files
+
+import pytest  # For expected errors
+
+from record_stream import iter_records  # Code under test
+
+RECORDS = [
+    {'date': 20210307, 'state': 'XA', 'positiveIncrease': 5, 'notes': 'a "quoted" {brace} [x]'},
+    {'date': 20210306, 'state': 'XA', 'nested': {'positiveIncrease': 99}, 'positiveIncrease': None},
+    {'date': 20210305, 'state': 'XA'},
+]
+
+
+@pytest.mark.parametrize('fields', [None, ('date', 'positiveIncrease')])
+@pytest.mark.parametrize('chunk_size', [7, 1 << 16])
+def test_streamed_records_match_json_load(tmp_path, fields, chunk_size):
+    path = tmp_path / 'xa.json'
+    path.write_text(json.dumps(RECORDS))
+
+    streamed = list(iter_records(str(path), fields, chunk_size=chunk_size))
+
+    if fields is None:
+        assert streamed == RECORDS
+    else:
+        assert streamed == [
+            {'date': 20210307, 'positiveIncrease': 5},
+            {'date': 20210306, 'positiveIncrease': None},
+            {'date': 20210305},
+        ]
+
+
+def test_iter_records_rejects_non_arrays(tmp_path):
+    path = tmp_path / 'xa.json'
+    path.write_text('{"date": 20210307}')
+
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
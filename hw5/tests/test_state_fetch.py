@@ -0,0 +1,166 @@
+# Import necessary libraries
+import json  # For writing state files
+import os  # For file times
+import time  # For the current time
+
+import pytest  # For fixtures
+
+from state_fetch import StubServer, fetch_states  # Code under test
+
+RECORDS = [
+    {'date': 20210307, 'state': 'XA', 'positiveIncrease': 5, 'deathIncrease': 1},
+    {'date': 20210306, 'state': 'XA', 'positiveIncrease': 0, 'deathIncrease': 0},
+]
+HOUR = 3600
+
+
+def write_state(folder, state, records, modified):
+    """
+    Write <state>.json into folder with the given modification time.
+
+    :param folder: pathlib.Path of the folder
+    :param state: State code
+    :param records: Records to write
+    :param modified: Modification time (seconds since the epoch)
+    :return: Path of the file
+    """
+    path = folder / f"{state}.json"
+    path.write_text(json.dumps(records))
+    os.utime(path, (modified, modified))
+    return path
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    """
+    Separate server and client data folders.
+
+    :return: (server folder, client folder)
+    """
+    server_dir, client_dir = tmp_path / 'server', tmp_path / 'client'
+    server_dir.mkdir()
+    client_dir.mkdir()
+    return server_dir, client_dir
+
+
+@pytest.fixture
+def server(dirs):
+    """
+    Stub API serving the server folder.
+
+    :return: Running StubServer
+    """
+    stub = StubServer(str(dirs[0])).start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def fetch(server, client_dir, states, max_age, fields=None, load=True):
+    """
+    Run fetch_states against the stub, consuming each state's record stream.
+
+    :return: Dictionary of state -> (list of records or None, status)
+    """
+    results = fetch_states(states, str(client_dir), server.url, max_workers=4, max_age=max_age, fields=fields, load=load)
+    return {state: (None if data is None else list(data), status) for state, data, status in results}
+
+
+def test_each_status(dirs, server):
+    server_dir, client_dir = dirs
+    now = time.time()
+    day_old = now - 24 * HOUR
+
+    # fr: fresh local copy, never requested
+    write_state(client_dir, 'fr', RECORDS, now)
+    # nm: old local copy that matches the server's, revalidated with a 304
+    write_state(server_dir, 'nm', RECORDS, day_old)
+    write_state(client_dir, 'nm', RECORDS, day_old)
+    # up: the server has a newer version, downloaded again
+    write_state(server_dir, 'up', RECORDS + RECORDS[:1], now - HOUR)
+    write_state(client_dir, 'up', RECORDS, day_old)
+    # dl: no local copy, downloaded
+    write_state(server_dir, 'dl', RECORDS, day_old)
+    # st: the server does not have it, the old local copy is used
+    write_state(client_dir, 'st', RECORDS, day_old)
+    # xx: nowhere at all
+
+    results = fetch(server, client_dir, ['fr', 'nm', 'up', 'dl', 'st', 'xx'], max_age=HOUR)
+
+    assert {state: status for state, (_, status) in results.items()} == {
+        'fr': 'fresh', 'nm': 'not-modified', 'up': 'downloaded', 'dl': 'downloaded', 'st': 'stale', 'xx': 'failed',
+    }
+    assert results['xx'][0] is None
+    assert results['fr'][0] == RECORDS
+    assert len(results['up'][0]) == 3
+    assert json.loads((client_dir / 'dl.json').read_text()) == RECORDS
+    assert json.loads((client_dir / 'up.json').read_text()) == RECORDS + RECORDS[:1]
+    # nm, up and dl reached the stub; fr was fresh and st/xx were 404s, which the stub does not count
+    assert server.requests == 3
+    # A 304 restarts the freshness window
+    assert os.path.getmtime(client_dir / 'nm.json') > now - 60
+    assert not list(client_dir.glob('*.part'))
+
+
+def test_second_run_is_served_locally(dirs, server):
+    server_dir, client_dir = dirs
+    for state in ('aa', 'bb', 'cc'):
+        write_state(server_dir, state, RECORDS, time.time() - HOUR)
+
+    first = fetch(server, client_dir, ['aa', 'bb', 'cc'], max_age=HOUR)
+    assert {status for _, status in first.values()} == {'downloaded'}
+    assert server.requests == 3
+
+    second = fetch(server, client_dir, ['aa', 'bb', 'cc'], max_age=HOUR)
+    assert {status for _, status in second.values()} == {'fresh'}
+    assert server.requests == 3  # Nothing was requested again
+
+
+def test_fields_are_projected(dirs, server):
+    server_dir, client_dir = dirs
+    write_state(server_dir, 'dl', RECORDS, time.time() - HOUR)
+
+    data, status = fetch(server, client_dir, ['dl'], max_age=HOUR, fields=('date', 'positiveIncrease'))['dl']
+
+    assert status == 'downloaded'
+    assert data == [{'date': 20210307, 'positiveIncrease': 5}, {'date': 20210306, 'positiveIncrease': 0}]
+
+
+def test_records_are_streamed_not_materialized(dirs, server):
+    server_dir, client_dir = dirs
+    write_state(server_dir, 'dl', RECORDS, time.time() - HOUR)
+
+    [(state, data, status)] = fetch_states(['dl'], str(client_dir), server.url, max_age=HOUR, fields=('date',))
+
+    assert status == 'downloaded'
+    assert not isinstance(data, list)  # Parsed lazily, as the caller consumes it
+    assert list(data) == [{'date': 20210307}, {'date': 20210306}]
+
+
+def test_load_false_only_fetches(dirs, server):
+    server_dir, client_dir = dirs
+    write_state(server_dir, 'dl', RECORDS, time.time() - HOUR)
+    write_state(client_dir, 'fr', RECORDS, time.time())
+
+    results = fetch(server, client_dir, ['dl', 'fr'], max_age=HOUR, load=False)
+
+    assert results == {'dl': (None, 'downloaded'), 'fr': (None, 'fresh')}
+    assert json.loads((client_dir / 'dl.json').read_text()) == RECORDS
+
+
+def test_submission_window_is_bounded(dirs, server):
+    server_dir, client_dir = dirs
+    states = [f"s{i}" for i in range(10)]
+    for state in states:
+        write_state(server_dir, state, RECORDS, time.time() - HOUR)
+    server.latency = 0.02
+
+    results = fetch_states(states, str(client_dir), server.url, max_workers=2, max_age=HOUR)
+    first = next(results)
+    time.sleep(0.3)  # Anything already submitted has reached the stub by now
+
+    # Two in the first window, refilled by at most two more when the first results came in
+    assert server.requests <= 4
+    rest = list(results)
+    assert sorted(state for state, _, _ in [first] + rest) == states
+    assert server.requests == 10
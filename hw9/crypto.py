@@ -1,6 +1,9 @@
 import requests
 import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 import networkx as nx
 from itertools import permutations
@@ -16,26 +19,91 @@ coins = {
     'bitcoin': 'btc'
 }
  
-def fetch_coin_prices(coins):
+def load_coins(file_name):
+    """
+    Load the coin universe from a name,ticker per line file such as coins.txt.
+    
+    Args:
+        file_name (str): Path to the coin file
+    
+    Returns:
+        dict: Dictionary of cryptocurrency names and tickers
+    """
+    coin_map = {}
+    with open(file_name, 'r') as coin_file:
+        for line in coin_file:
+            if line.strip():
+                name, ticker = line.strip().split(',')
+                coin_map[name.strip()] = ticker.strip()
+    return coin_map
+ 
+def fetch_price_batch(session, ids, tickers, retries=3, backoff=1.0):
+    """
+    Fetch one block of the id x currency space, retrying just this block.
+    
+    Args:
+        session (requests.Session): Pooled session shared by all batches
+        ids (list): Coin names for the ids parameter
+        tickers (list): Tickers for the vs_currencies parameter
+        retries (int): Retries after network errors, 429s and 5xx responses
+        backoff (float): Base delay in seconds, doubled per retry
+    
+    Returns:
+        dict: Partial API response, or an empty dict if every attempt failed
+    """
+    url = 'https://api.coingecko.com/api/v3/simple/price'
+    params = {'ids': ','.join(ids), 'vs_currencies': ','.join(tickers)}
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, timeout=10)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code != 429 and response.status_code < 500:
+                break
+        except requests.RequestException:
+            pass
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    print(f'Failed to fetch prices for {ids[0]}..{ids[-1]} in {tickers[0]}..{tickers[-1]}')
+    return {}
+ 
+def fetch_coin_prices(coins, ids_per_batch=50, tickers_per_batch=25, max_workers=8):
     """
     Fetch cryptocurrency exchange rates from CoinGecko API.
     
+    The id x currency space is split into blocks so no single URL or
+    response has to hold the whole universe. The blocks are fetched
+    concurrently over one pooled session and merged into one snapshot.
+    
     Args:
         coins (dict): Dictionary of cryptocurrency names and tickers
+        ids_per_batch (int): Coin names per request
+        tickers_per_batch (int): Tickers per request
+        max_workers (int): Number of concurrent requests
     
     Returns:
         dict: API response containing exchange rates
     """
-    # Construct URL by joining coin names and tickers
-    names_url = ','.join(coins.keys())
-    ticker_url = ','.join(coins.values())
- 
-    # Construct full API URL for price retrieval
-    url = f'https://api.coingecko.com/api/v3/simple/price?ids={names_url}&vs_currencies={ticker_url}'
+    # Tile names and tickers into blocks that each fit in one request
+    names = list(coins.keys())
+    tickers = list(dict.fromkeys(coins.values()))
+    batches = [
+        (names[i:i + ids_per_batch], tickers[j:j + tickers_per_batch])
+        for i in range(0, len(names), ids_per_batch)
+        for j in range(0, len(tickers), tickers_per_batch)
+    ]
+    
+    # One connection pool shared by every worker thread
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
     
-    # Make API request and parse JSON response
-    response = requests.get(url)
-    data = response.json()
+    # Fetch blocks concurrently and merge the partial responses in batch order
+    data = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for part in pool.map(lambda batch: fetch_price_batch(session, *batch), batches):
+            for coin, coin_data in part.items():
+                data.setdefault(coin, {}).update(coin_data)
     
     # Save JSON data to local file for reference
     curr_dir = os.path.dirname(__file__)
@@ -61,7 +129,7 @@ def create_crypto_graph(data, coins):
     
     # Iterate through each coin to create graph edges
     for coin in coins:
-        one_coin_dict = data[coin]
+        one_coin_dict = data.get(coin, {})  # A failed batch can leave a coin out
         for tkr in one_coin_dict:
             # Extract node information and exchange rate
             node_from = coins[coin]
@@ -103,12 +171,39 @@ def visualize_graph(graph):
     plt.savefig(graph_visual_fil)
     plt.close()
  
-def find_arbitrage_opportunities(graph):
+def weighted_paths(graph, source, target):
+    """
+    Enumerate every simple path from source to target once, with its weight.
+    
+    Args:
+        graph (networkx.DiGraph): Cryptocurrency exchange rate graph
+        source (str): Starting ticker
+        target (str): Ending ticker
+    
+    Returns:
+        list: (path, product of edge weights) tuples in all_simple_paths order
+    """
+    paths = []
+    for path in nx.all_simple_paths(graph, source=source, target=target):
+        path_weight = 1
+        for i in range(len(path)-1):
+            path_weight *= graph[path[i]][path[i+1]]['weight']
+        paths.append((path, path_weight))
+    return paths
+ 
+def find_arbitrage_opportunities(graph, verbose=False):
     """
     Find potential arbitrage opportunities by calculating path weights.
     
+    Paths and their weights are computed once per ordered pair and reused.
+    Every factor is a forward weight times a backward weight, so the
+    extremes for a pair are just the per-direction extremes multiplied
+    together; the forward x backward cross product is only walked when
+    verbose output is requested.
+    
     Args:
         graph (networkx.DiGraph): Cryptocurrency exchange rate graph
+        verbose (bool): Print every path combination (buffered per node pair)
     
     Returns:
         tuple: Smallest and highest arbitrage path factors
@@ -119,58 +214,71 @@ def find_arbitrage_opportunities(graph):
     smallest_paths = []
     highest_path = []
     
+    # Memoized (path, weight) lists per ordered node pair
+    memo = {}
+    def paths_between(source, target):
+        if (source, target) not in memo:
+            memo[(source, target)] = weighted_paths(graph, source, target)
+        return memo[(source, target)]
+    
     # Iterate through all possible node pairs
     for n1, n2 in permutations(graph.nodes, 2):
-        print(f"\npaths from {n1} to {n2} ----------------------------------")
-        # Find all paths between two nodes
-        for path in nx.all_simple_paths(graph, source=n1, target=n2):
-            # Calculate forward path weight
-            forward_path_weight = 1
-            for i in range(len(path)-1):
-                forward_path_weight *= graph[path[i]][path[i+1]]['weight']
-            
-            # Find reverse paths
-            for path_back in nx.all_simple_paths(graph, source=n2, target=n1):
-                # Calculate backward path weight
-                backward_path_weight = 1
-                for j in range(len(path_back)-1):
-                    backward_path_weight *= graph[path_back[j]][path_back[j+1]]['weight']
-                
-                # Calculate path weights factor
-                path_weights_factor = forward_path_weight * backward_path_weight
-
-                # Print in requested format
-                print(f"{path} {forward_path_weight}")
-                print(f"{path_back} {backward_path_weight}")
-                print(f"{path_weights_factor}")
-                
-                # Update smallest arbitrage opportunity
-                if path_weights_factor < smallest_factor:
-                    smallest_factor = path_weights_factor
-                    smallest_paths = path + path_back
-                
-                # Update highest arbitrage opportunity
-                if path_weights_factor > highest_factor:
-                    highest_factor = path_weights_factor
-                    highest_path = path + path_back
+        forward_paths = paths_between(n1, n2)
+        backward_paths = paths_between(n2, n1)
+        
+        if verbose:
+            # Build this pair's report in memory and write it in one call
+            lines = [f"\npaths from {n1} to {n2} ----------------------------------"]
+            for path, forward_path_weight in forward_paths:
+                for path_back, backward_path_weight in backward_paths:
+                    lines.append(f"{path} {forward_path_weight}")
+                    lines.append(f"{path_back} {backward_path_weight}")
+                    lines.append(f"{forward_path_weight * backward_path_weight}")
+            sys.stdout.write('\n'.join(lines) + '\n')
+        
+        if not forward_paths or not backward_paths:
+            continue
+        
+        # min/max return the first extreme, matching the original strict comparisons
+        low_forward = min(forward_paths, key=lambda item: item[1])
+        low_backward = min(backward_paths, key=lambda item: item[1])
+        high_forward = max(forward_paths, key=lambda item: item[1])
+        high_backward = max(backward_paths, key=lambda item: item[1])
+        
+        # Update smallest arbitrage opportunity
+        if low_forward[1] * low_backward[1] < smallest_factor:
+            smallest_factor = low_forward[1] * low_backward[1]
+            smallest_paths = low_forward[0] + low_backward[0]
+        
+        # Update highest arbitrage opportunity
+        if high_forward[1] * high_backward[1] > highest_factor:
+            highest_factor = high_forward[1] * high_backward[1]
+            highest_path = high_forward[0] + high_backward[0]
     
     return smallest_factor, smallest_paths, highest_factor, highest_path
  
-def main():
+def main(verbose=False):
     """
     Main function to orchestrate cryptocurrency arbitrage analysis.
+    
+    Args:
+        verbose (bool): Print every forward/backward path combination
     """
+    # Load the coin universe from coins.txt, falling back to the built-in list
+    coins_file = os.path.join(os.path.dirname(__file__), 'coins.txt')
+    coin_map = load_coins(coins_file) if os.path.exists(coins_file) else coins
+    
     # Fetch cryptocurrency exchange rates
-    data = fetch_coin_prices(coins)
+    data = fetch_coin_prices(coin_map)
     
     # Create cryptocurrency exchange rate graph
-    graph = create_crypto_graph(data, coins)
+    graph = create_crypto_graph(data, coin_map)
     
     # Visualize the graph
     visualize_graph(graph)
     
     # Find opportunities
-    smallest_factor, smallest_paths, highest_factor, highest_path = find_arbitrage_opportunities(graph)
+    smallest_factor, smallest_paths, highest_factor, highest_path = find_arbitrage_opportunities(graph, verbose=verbose)
     
     # Print  opportunity results
     print('_____________________________________________________')
@@ -182,4 +290,4 @@ def main():
  
 # Ensure script runs only when directly executed
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(verbose='--verbose' in sys.argv[1:])
\ No newline at end of file